@@ -86,13 +86,18 @@ class OptionsParamType(ParamType):
         from dan.make import Make
         from dan.core.asyncio import sync_wait
         build_path = ctx.params['build_path']
-        make = Make(build_path, quiet=True, terminal_mode=TerminalMode.BASIC)
-        sync_wait(make.initialize())
+        make = Make(build_path, verbose=-1, terminal_mode=TerminalMode.BASIC)
+        graph = make.cached_graph()
+        if graph is not None:
+            fullnames = graph['options']
+        else:
+            sync_wait(make.initialize())
+            fullnames = [opt.fullname for opt in make.all_options]
         
         comps = []
-        for opt in make.all_options:
-            if opt.fullname.startswith(incomplete):
-                comps.append(CompletionItem(opt.fullname, type='nospace'))
+        for fullname in fullnames:
+            if fullname.startswith(incomplete):
+                comps.append(CompletionItem(fullname, type='nospace'))
         
         return comps
 
@@ -101,7 +106,7 @@ class TargetParamType(ParamType):
     def __init__(self, target_types=None) -> None:
         from dan.core.target import Target
         if target_types is None:
-            self.target_types = (Target)
+            self.target_types = (Target,)
         else:
             self.target_types = tuple(target_types)
         super().__init__()
@@ -111,13 +116,19 @@ class TargetParamType(ParamType):
         from dan.make import Make
         from dan.core.asyncio import sync_wait
         build_path = ctx.params['build_path']
-        make = Make(build_path, quiet=True, terminal_mode=TerminalMode.BASIC)
-        sync_wait(make.initialize())
+        make = Make(build_path, verbose=-1, terminal_mode=TerminalMode.BASIC)
+        graph = make.cached_graph()
+        if graph is not None:
+            type_names = {f'{cls.__module__}.{cls.__qualname__}' for cls in self.target_types}
+            fullnames = [fullname for fullname, names in graph['targets'].items() if not type_names.isdisjoint(names)]
+        else:
+            sync_wait(make.initialize())
+            fullnames = [target.fullname for target in make.root.all_targets if isinstance(target, self.target_types)]
 
         comps = []
-        for target in make.root.all_targets:
-            if isinstance(target, self.target_types) and target.fullname.startswith(incomplete):
-                comps.append(CompletionItem(target.fullname, type='nospace'))
+        for fullname in fullnames:
+            if fullname.startswith(incomplete):
+                comps.append(CompletionItem(fullname, type='nospace'))
         
         return comps
 
@@ -217,11 +217,10 @@ async def create_repository(force, name):
         if not dest.parent.exists():
             click.logger.debug('Creating directory %s...', dest)
             dest.parent.mkdir(parents=True)
-        async with aiofiles.open(dest, 'w') as f:
-            click.logger.info('Generating %s...', dest)
-            await f.write(templateEnv.get_template(template_name).render(
-                name = name,
-            ))
+        click.logger.info('Generating %s...', dest)
+        await aiofiles.write_file(dest, templateEnv.get_template(template_name).render(
+            name = name,
+        ))
         
     io_settings = _get_settings()
     if name in io_settings.repositories:
@@ -258,19 +257,17 @@ async def create_package(force, repo_name, package_name, **kwargs):
 
     import jinja2
     templateEnv = jinja2.Environment(loader=jinja2.PackageLoader('dan.cli'))
-    async with aiofiles.open(dest / 'dan-build.py', 'w') as f:
-        click.logger.info('Generating %s...', dest)
-        await f.write(templateEnv.get_template('package/dan-build.py').render(
-            package_name = package_name,
-            **kwargs
-        ))
+    click.logger.info('Generating %s...', dest)
+    await aiofiles.write_file(dest / 'dan-build.py', templateEnv.get_template('package/dan-build.py').render(
+        package_name = package_name,
+        **kwargs
+    ))
     
     packages = [d.name for d in packages_path.iterdir() if d.is_dir() and (d / 'dan-build.py').exists()]
-    async with aiofiles.open(packages_path / 'dan-build.py', 'w') as f:
-        await f.write(templateEnv.get_template('package_repository/packages/dan-build.py').render(
-            name = repo_name,
-            packages = packages,
-        ))
+    await aiofiles.write_file(packages_path / 'dan-build.py', templateEnv.get_template('package_repository/packages/dan-build.py').render(
+        name = repo_name,
+        packages = packages,
+    ))
 
 
 def main():
@@ -246,12 +246,12 @@ def uninstall(verbose: int, yes: bool, root: str, name: str):
     if yes:
         def rm_empty(dir: Path):
             if dir.is_empty:
-                click.logger.debug(f'removing empty directory: {dir}')
+                click.logger.debug('removing empty directory: %s', dir)
                 os.rmdir(dir)
                 rm_empty(dir.parent)
 
         for f in files:
-            click.logger.debug(f'removing: {f}')
+            click.logger.debug('removing: %s', f)
             os.remove(f)
             rm_empty(f.parent)
 
@@ -273,13 +273,24 @@ def ls(ctx: CommandsContext):
 async def targets(ctx: CommandsContext, all: bool, show_type: bool, **kwargs):
     """List targets"""
     kwargs['quiet'] = True
-    async with ctx(**kwargs) as make:
+    async with ctx(no_init=True, **kwargs) as make:
         out = []
-        for target in make.targets:
-            if show_type:
-                out.append(target.fullname + ' - ' + type(target).__name__)
-            else:
-                out.append(target.fullname)
+        graph = make.cached_graph()
+        if graph is not None:
+            # makefiles unchanged since last initialization: no need to execute them
+            type_names = graph['type_names']
+            for fullname in make.cached_target_names(graph):
+                if show_type:
+                    out.append(fullname + ' - ' + type_names[fullname])
+                else:
+                    out.append(fullname)
+        else:
+            await make.initialize()
+            for target in make.targets:
+                if show_type:
+                    out.append(target.fullname + ' - ' + type(target).__name__)
+                else:
+                    out.append(target.fullname)
         click.echo('\n'.join(out))
 
 
@@ -36,8 +36,7 @@ class ConanFile(Target, internal=True):
         template = jinja2.Environment(
             loader=jinja2.BaseLoader).from_string(_conanfile_template)
         content = template.render(requirements=self.__reqs)
-        async with aiofiles.open(self.output, 'w') as out:
-            await out.write(content)
+        await aiofiles.write_file(self.output, content)
 
 
 class Requirements(Target, internal=True):
@@ -1,4 +1,5 @@
 import asyncio
+import builtins
 from aiofiles import *
 from aiofiles import os
 
@@ -8,7 +9,10 @@ import re
 import sys
 import errno
 import contextlib
+from enum import Enum
+import filecmp
 import time
+import typing as t
 
 from dan.core.pathlib import Path
 
@@ -36,6 +40,16 @@ async def _rmtree_force(path: Path):
         await asyncio.gather(*clean_dirs)
     await os.rmdir(path)
 
+async def remove_files(paths: t.Iterable[Path | str]):
+    """Remove several files in a single worker thread dispatch, missing files are ignored"""
+    def _remove():
+        for path in paths:
+            try:
+                sync_os.unlink(path)
+            except FileNotFoundError:
+                pass
+    await asyncio.to_thread(_remove)
+
 async def rmtree(path: Path, force=False):
     if force:
         await _rmtree_force(path)
@@ -56,12 +70,52 @@ async def copy(src : Path, dest : Path, chunk_size=2048):
     dest.chmod(src.stat().st_mode)
 
 
+class CopyStatus(Enum):
+    outdated = 0
+    younger = 1
+    same_content = 2
+
+
+async def is_up_to_date_copy(src: Path, dest: Path) -> CopyStatus:
+    """Check whether dest is an up-to-date copy of src, in a single worker thread dispatch
+
+    dest is up-to-date when younger than src, or when its content is the same (only its mtime is outdated then).
+    """
+    def _check():
+        try:
+            dest_stat = sync_os.stat(dest)
+        except FileNotFoundError:
+            return CopyStatus.outdated
+        if dest_stat.st_mtime > sync_os.stat(src).st_mtime:
+            return CopyStatus.younger
+        if filecmp.cmp(src, dest, False):
+            return CopyStatus.same_content
+        return CopyStatus.outdated
+    return await asyncio.to_thread(_check)
+
+
+async def write_file(path, data: str | bytes | t.Iterable[str], mode='w'):
+    """Write a whole file at once
+
+    Uses a single worker thread dispatch, aiofiles dispatches open, each write and close separately.
+    """
+    def _write():
+        with builtins.open(path, mode) as f:
+            if isinstance(data, (str, bytes)):
+                f.write(data)
+            else:
+                f.writelines(data)
+    await asyncio.to_thread(_write)
+
+
 async def sub(filepath, pattern, repl, **kwargs):
-    async with open(filepath) as f:
-        content = await f.read()
-    content = re.sub(pattern, repl, content, **kwargs)
-    async with open(filepath, 'w') as f:
-        await f.write(content)
+    def _sub():
+        with builtins.open(filepath) as f:
+            content = f.read()
+        content = re.sub(pattern, repl, content, **kwargs)
+        with builtins.open(filepath, 'w') as f:
+            f.write(content)
+    await asyncio.to_thread(_sub)
 
 
 
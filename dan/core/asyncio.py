@@ -2,6 +2,7 @@ from asyncio import *
 from async_property import *
 
 import threading
+import weakref
 import concurrent.futures
 import multiprocessing
 import typing as t
@@ -27,41 +28,48 @@ class Cached(BaseDecorator):
     def __init__(self, fn, unique=False):
         self.__fn = fn
         self.__unique = unique
-        self.__is_method = fn.__call__.__class__.__name__ == "method-wrapper"
-        if not self.__is_method and self.__unique:
-            self.__cache = None
-        else:
-            self.__cache: dict[int, Future] = dict()
+        self.clear_all()
+
+    def __futures(self, args, kwds) -> tuple[dict, t.Hashable]:
+        """Resolve the futures storage and the key of a call
+
+        Futures are stored per first argument (ie.: self) in a weak mapping:
+        they do not keep instances alive, and a recycled instance id cannot hit a stale result.
+        """
+        key = None if self.__unique else (args[1:], frozenset(kwds.items()))
+        if args:
+            owner = args[0]
+            try:
+                futures = self.__by_owner.get(owner)
+                if futures is None:
+                    futures = self.__by_owner[owner] = dict()
+                return futures, key
+            except TypeError:
+                # not weak-referenceable (eg.: free function called with an int)
+                pass
+            if key is None:
+                key = owner
+            else:
+                key = (owner, key)
+        return self.__others, key
 
     async def __call__(self, *args, **kwds):
-        if not self.__is_method and self.__unique:
-            if self.__cache is None:
-                self.__cache = Future()
-                try:
-                    self.__cache.set_result(await self.__fn(*args, **kwds))
-                except Exception as ex:
-                    self.__cache.set_exception(ex)
-            elif not self.__cache.done():
-                await self.__cache
-            return self.__cache.result()
-        else:
-            key = id(args[0]) if self.__unique else hash((args, frozenset(kwds)))
-            if key not in self.__cache:
-                self.__cache[key] = Future()
-                try:
-                    self.__cache[key].set_result(await self.__fn(*args, **kwds))
-                except Exception as ex:
-                    self.__cache[key].set_exception(ex)
-            elif not self.__cache[key].done():
-                await self.__cache[key]
-
-            return self.__cache[key].result()
+        futures, key = self.__futures(args, kwds)
+        future = futures.get(key)
+        if future is None:
+            future = futures[key] = Future()
+            try:
+                future.set_result(await self.__fn(*args, **kwds))
+            except Exception as ex:
+                future.set_exception(ex)
+        elif not future.done():
+            await future
+
+        return future.result()
 
     def clear_all(self):
-        if self.__unique:
-            self.__cache = dict()
-        else:
-            self.__cache = None
+        self.__by_owner: weakref.WeakKeyDictionary[t.Any, dict[t.Hashable, Future]] = weakref.WeakKeyDictionary()
+        self.__others: dict[t.Hashable, Future] = dict()
 
 
 def cached(*args, **kwargs):
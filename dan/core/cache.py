@@ -2,7 +2,8 @@ import dataclasses
 import functools
 import json
 import pickle
-import aiofiles
+import weakref
+from dan.core import aiofiles
 import typing as t
 
 
@@ -34,6 +35,13 @@ class Cache(t.Generic[T]):
         assert not self.name in self.__caches, 'a cache should be unique'
         self.__caches[self.name] = self
 
+        self.__args = args
+        self.__kwargs = kwargs
+        # loaded on first data access: most caches are created but never read
+        self.__data: T = None
+        self.__dirty = False
+
+    def __load(self):
         if self.path.exists():
             with open(self.path, 'rb') as f:
                 if dataclasses.is_dataclass(self.dataclass):
@@ -44,11 +52,10 @@ class Cache(t.Generic[T]):
                     self.__data = self.dataclass(**self.__data)
                 self.__modification_date = self.path.modification_time
         else:
-            self.__data = self.dataclass(*args, **kwargs)
+            self.__data = self.dataclass(*self.__args, **self.__kwargs)
             self.__modification_date = 0.0
-        
+        del self.__args, self.__kwargs
         self.__initial_state = self._dump()
-        self.__dirty = False
     
     @classmethod
     def instance(cls, path: Path|str, *args, cache_name:str = None, **kwargs):
@@ -80,12 +87,20 @@ class Cache(t.Generic[T]):
     def name(self):
         return self.__name
     
+    @property
+    def loaded(self):
+        return self.__data is not None
+
     @property
     def data(self) -> T|dict:
+        if self.__data is None:
+            self.__load()
         return self.__data
     
     @property
     def dirty(self):
+        if not self.loaded:
+            return False
         if not self.__dirty:
             self.__state = self._dump()
             self.__dirty = self.__initial_state != self.__state
@@ -93,10 +108,11 @@ class Cache(t.Generic[T]):
     
     async def save(self, force=False):
         if self.path and (self.dirty or force):
+            if force:
+                self.__state = self._dump()
             if self.__state:
                 self.path.parent.mkdir(exist_ok=True, parents=True)
-                async with aiofiles.open(self.path, 'wb') as f:
-                    await f.write(self.__state)
+                await aiofiles.write_file(self.path, self.__state, 'wb')
                 self.__dirty = False
 
     @classmethod
@@ -116,16 +132,16 @@ class Cache(t.Generic[T]):
             del self.__caches[self.name]
 
 
-def once_method(fn):    
-    result_name = f'_{fn.__name__}_result'
+def once_method(fn):
+    results: weakref.WeakKeyDictionary[t.Any, t.Any] = weakref.WeakKeyDictionary()
 
     @functools.wraps(fn)
     def wrapper(self, *args, **kwds):
-        if hasattr(self, result_name):
-            return getattr(self, result_name)
-        
-        result = fn(self, *args, **kwds)
-        setattr(self, result_name, result)
+        try:
+            return results[self]
+        except KeyError:
+            pass
+        result = results[self] = fn(self, *args, **kwds)
         return result
 
     return wrapper
@@ -1,19 +1,30 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass
+import json
 from pathlib import Path
-from dataclasses_json import DataClassJsonMixin, config, LetterCase
 from enum import Enum
 import typing as t
 
 
-def hidden_field(*args, **kwargs):
-    """Return an object to identify dataclass fields, but is will not be serialized.
-    
-    See: dataclasses.field"""
-    metadata = config(kwargs.pop('metadata', None), exclude=lambda _:True)
-    return field(*args, metadata=metadata, **kwargs)
+enabled = False
+_listeners: list[t.Callable[[bool], None]] = list()
 
 
-enabled = False
+def on_change(listener: t.Callable[[bool], None]):
+    """Register a listener called with the current enabled state, then on every change"""
+    _listeners.append(listener)
+    listener(enabled)
+
+
+def enable(value = True):
+    global enabled
+    enabled = value
+    for listener in _listeners:
+        listener(value)
+
+
+def disable():
+    enable(False)
+
 
 class Severity(Enum):
     ERROR = 0
@@ -21,64 +32,111 @@ class Severity(Enum):
     INFO = 2
     HINT = 3
 
-@dataclass(init=False)
+@dataclass(init=False, slots=True)
 class Uri:
     """Javascript-friendly URI"""
-    scheme: str = 'file'
+    scheme: str
     path: str
-    fragment: str = ''
+    fragment: str
 
     def __init__(self, path: str|Path) -> None:
+        self.scheme = 'file'
         self.path = str(path)
+        self.fragment = ''
+
+    def to_dict(self) -> dict:
+        return {'scheme': self.scheme, 'path': self.path, 'fragment': self.fragment}
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Position:
     line: int = 0
     character: int = 0
 
-@dataclass
+    def to_dict(self) -> dict:
+        return {'line': self.line, 'character': self.character}
+
+_ZERO_POSITION = Position()
+
+@dataclass(frozen=True, slots=True)
 class Range:
-    start: Position = field(default_factory=Position)
-    end: Position = field(default_factory=Position)
+    start: Position = _ZERO_POSITION
+    end: Position = _ZERO_POSITION
+
+    def to_dict(self) -> dict:
+        return {'start': self.start.to_dict(), 'end': self.end.to_dict()}
+
+_DEFAULT_RANGE = Range()
 
 
-@dataclass
+@dataclass(slots=True)
 class Location:
     uri: Uri
     range: Range
 
+    def to_dict(self) -> dict:
+        return {'uri': self.uri.to_dict(), 'range': self.range.to_dict()}
 
-@dataclass
+
+@dataclass(slots=True)
 class RelatedInformation:
     location: Location
     message: str
 
+    def to_dict(self) -> dict:
+        return {'location': self.location.to_dict(), 'message': self.message}
+
 
-@dataclass
-class Diagnostic(DataClassJsonMixin):
-    dataclass_json_config = config(letter_case=LetterCase.CAMEL)['dataclasses_json']
+@dataclass(slots=True)
+class Diagnostic:
     message: str
-    range: Range = field(default_factory=Range)
+    range: Range = _DEFAULT_RANGE
     severity: Severity = Severity.ERROR
     code: t.Optional[str|int] = None
     source: t.Optional[str] = None
     related_information: t.Optional[list[RelatedInformation]] = None
-    filename: t.Optional[str] = hidden_field(default=None)
-
-
-class DiagnosticCollection(dict[str, list[Diagnostic]], DataClassJsonMixin):
-    
-    def __setitem__(self, key: str, value: list[Diagnostic]) -> None:
-        match value:
-            case list():
-                return super().__setitem__(key, value)
-            case Diagnostic():
-                if not key in self:
-                    super().__setitem__(key, list())
-                return self[key].append(value)
-            case _:
-                raise ValueError(f'Unallowed assignment: {type(value)}')
+    filename: t.Optional[str] = None
+    """Not serialized, used to dispatch the diagnostic into a DiagnosticCollection"""
+
+    def to_dict(self) -> dict:
+        """Javascript-friendly (camelCase) dict, None values are omitted"""
+        result = {
+            'message': self.message,
+            'range': self.range.to_dict(),
+            'severity': self.severity.value,
+        }
+        code = self.code
+        if code is not None:
+            result['code'] = code
+        source = self.source
+        if source is not None:
+            result['source'] = source
+        related_information = self.related_information
+        if related_information is not None:
+            result['relatedInformation'] = [info.to_dict() for info in related_information]
+        return result
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+class DiagnosticCollection(dict[str, list[Diagnostic]]):
+
+    def __setitem__(self, key: str, value: list[Diagnostic] | Diagnostic) -> None:
+        if value.__class__ is list:
+            dict.__setitem__(self, key, value)
+        elif isinstance(value, Diagnostic):
+            self.setdefault(key, []).append(value)
+        elif isinstance(value, list):
+            dict.__setitem__(self, key, value)
+        else:
+            raise ValueError(f'Unallowed assignment: {type(value)}')
 
     def insert(self, diagnostics: list[Diagnostic],  default_key: str):
         for diagnostic in diagnostics:
             self[default_key if diagnostic.filename is None else diagnostic.filename] = diagnostic
+
+    def to_dict(self) -> dict:
+        return {key: [d.to_dict() for d in diagnostics] for key, diagnostics in self.items()}
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
@@ -1,5 +1,7 @@
+import importlib.machinery
 import importlib.util
 from contextlib import contextmanager
+import functools
 import os
 import sys
 
@@ -40,6 +42,8 @@ class Context(Logging):
         self.__ctx_stack: list[Context] = []
         self.__makefile_stack: list[MakeFile] = []
         self.__attributes = dict()
+        # python paths already added to sys.path by this context
+        self._syspath_set: set[str] = set()
 
     @property
     def root(self):
@@ -77,7 +81,7 @@ class Context(Logging):
 
     @contextmanager
     def _init_makefile(self, module, name: str = 'root', build_path: Path = None, requirements: MakeFile = None, parent: MakeFile = None, is_requirement=False):
-        source_path = Path(module.__file__).parent
+        source_path = Path(os.path.dirname(module.__file__))
 
         if self.__root is None:
             self.__root = module
@@ -110,6 +114,39 @@ class MakeFileError(RuntimeError):
         super().__init__(f'failed to load {self.path}')
 
 
+def _include_lookups(name: str | Path) -> tuple[str, str]:
+    return (
+        os.path.join(name, 'dan-build.py'),
+        f'{name}.py',
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_include(source_path: Path, name: str | Path) -> Path | None:
+    """Find the makefile included as name from source_path.
+
+    Results are memoized, so that sibling makefiles including the same
+    sub-directory do not walk the filesystem again.
+    """
+    for lookup in _include_lookups(name):
+        module_path = os.path.join(source_path, lookup)
+        if os.path.isfile(module_path):
+            return Path(module_path)
+    return None
+
+
+_specs: dict[tuple[str, str], importlib.machinery.ModuleSpec] = dict()
+
+
+def _spec_from_file_location(module_name: str, module_path: Path):
+    key = (module_name, str(module_path))
+    spec = _specs.get(key)
+    if spec is None:
+        spec = importlib.util.spec_from_file_location(module_name, module_path)
+        _specs[key] = spec
+    return spec
+
+
 def load_makefile(module_path: Path,
                   name: str = None,
                   module_name: str = None,
@@ -121,8 +158,7 @@ def load_makefile(module_path: Path,
     module_name = module_name or name
     if module_path in context.imported_makefiles:
         return context.imported_makefiles[module_path]
-    spec = importlib.util.spec_from_file_location(
-        module_name, module_path)
+    spec = _spec_from_file_location(module_name, module_path)
     module = importlib.util.module_from_spec(spec)
     context.imported_makefiles[module_path] = module
     with context._init_makefile(module, name, build_path, requirements, parent, is_requirement):
@@ -134,6 +170,12 @@ def load_makefile(module_path: Path,
     return module
 
 
+def _missing_include_error(names: list[str | Path]):
+    return RuntimeError('; '.join(
+        f'Cannot find anything to include for "{name}" (looked for: {", ".join(_include_lookups(name))})'
+        for name in names))
+
+
 def include_makefile(name: str | Path, build_path: Path = None) -> set[Target]:
     ''' Include a sub-directory (or a sub-makefile).
     :returns: The set of exported targets.
@@ -142,40 +184,39 @@ def include_makefile(name: str | Path, build_path: Path = None) -> set[Target]:
     if not context.root:
         assert type(name) == type(Path())
         module_path: Path = name / 'dan-build.py'
-        spec = importlib.util.spec_from_file_location(
-            'root', module_path)
+        module_name = 'root'
         name = 'root'
     else:
-        lookups = [
-            os.path.join(name, 'dan-build.py'),
-            f'{name}.py',
-        ]
-        for lookup in lookups:
-            module_path = context.current.source_path / lookup
-            if module_path.exists():
-                spec = importlib.util.spec_from_file_location(
-                    f'{context.current.name}.{name}', module_path)
-                break
-        else:
-            raise RuntimeError(
-                f'Cannot find anything to include for "{name}" (looked for: {", ".join(lookups)})')
-        
+        module_path = _resolve_include(context.current.source_path, name)
+        if module_path is None:
+            raise _missing_include_error([name])
+        module_name = f'{context.current.name}.{name}'
+    return _include_module(name, module_path, module_name, build_path)
+
+
+def _include_module(name: str | Path, module_path: Path, module_name: str, build_path: Path = None):
     if module_path in context.imported_makefiles:
         return context.imported_makefiles[module_path]
 
-    if (module_path.parent / '__init__.py').exists():
-        p = str(module_path.parent.parent)
-        if not p in sys.path:
-            sys.path.append(p)
+    spec = _spec_from_file_location(module_name, module_path)
+
+    module_dir = os.path.dirname(module_path)
+    if os.path.isfile(os.path.join(module_dir, '__init__.py')):
+        p = os.path.dirname(module_dir)
+        if not p in context._syspath_set:
+            context._syspath_set.add(p)
+            if not p in sys.path:
+                sys.path.append(p)
 
     module = importlib.util.module_from_spec(spec)
     context.imported_makefiles[module_path] = module
 
     with context._init_makefile(module, name, build_path):
-        requirements_file = module_path.with_stem('dan-requires')
-        if module_path.stem == 'dan-build' and requirements_file.exists():
-            context.current.requirements = load_makefile(
-                requirements_file, name='dan-requires', module_name=f'{name}.requirements', is_requirement=True)
+        if module_path.stem == 'dan-build':
+            requirements_file = os.path.join(module_dir, 'dan-requires.py')
+            if os.path.isfile(requirements_file):
+                context.current.requirements = load_makefile(
+                    Path(requirements_file), name='dan-requires', module_name=f'{name}.requirements', is_requirement=True)
 
         try:
             spec.loader.exec_module(module)
@@ -193,5 +234,13 @@ def include(*names: str | Path) -> list[Target]:
     :param names: One (or more) subdirectory or makefile to include.
     :return: The list of targets exported by the included targets.
     """
-    for name in names:
-        include_makefile(name)
+    global context
+    # resolve everything first, so that missing includes are reported at once,
+    # before any makefile gets executed
+    source_path = context.current.source_path
+    resolved = [(name, _resolve_include(source_path, name)) for name in names]
+    missing = [name for name, module_path in resolved if module_path is None]
+    if missing:
+        raise _missing_include_error(missing)
+    for name, module_path in resolved:
+        _include_module(name, module_path, f'{context.current.name}.{name}')
@@ -1,7 +1,7 @@
 from functools import cached_property
-import functools
 from pathlib import Path
 import sys
+import typing as t
 
 from dan.core.cache import Cache
 from dan.core.target import Options, Target
@@ -25,22 +25,32 @@ class MakeFile(sys.__class__, Logging):
         self.build_path = build_path
         self.__requirements = requirements
         self.__pkgs_path = None
+        self.__default_pkgs_path = None
         self.parent = parent
         self.__is_requirement = is_requirement
         self.__cache: Cache = None
         self.children: list[MakeFile] = list()
-        if self.name != 'dan-requires' and self.parent:
+        self.__is_child = self.name != 'dan-requires' and self.parent is not None
+        if self.__is_child:
             self.parent.children.append(self)
+            self.__bump_rev()
+        self.__index: dict[str | type, Target] = dict()
         self.options = Options(self)
         self.__targets: set[Target] = set()
         self.__tests: set[Test] = set()
+        if self.parent is None:
+            self.__target_fullnames: set[str] = set()
+            self.__test_fullnames: set[str] = set()
+            self.__agg_rev = 0
+        self.__agg_cache: dict[str, tuple[int, t.Any]] = dict()
 
         from dan.core.include import context
         self.context = context
 
-    @property
+    @cached_property
     def fullname(self):
-        return f'{self.parent.fullname}.{self.name}' if self.parent else self.name
+        # interned: used as key in the registry and name lookups
+        return sys.intern(f'{self.parent.fullname}.{self.name}' if self.parent else self.name)
 
     @property
     def cache(self) -> Cache:
@@ -65,24 +75,26 @@ class MakeFile(sys.__class__, Logging):
                 return True
         return False
 
-    __target_fullnames = list()
-    __test_fullnames = list()
+    def __is_wrapper(self, cls: type, registered: set):
+        """Wrapper classes (see wraps) are registered with the name of the class they wrap"""
+        return any(issubclass(cls, type(t)) for t in registered)
+
     def register(self, cls: type[Target | Test]):
         """Register Target/Test class"""
         t = cls()
+        root = self.root
         if issubclass(cls, Target):
-            # if t.fullname in MakeFile.__target_fullnames:
-            #     raise RuntimeError(f'duplicate target name: {t.fullname}')
-            MakeFile.__target_fullnames.append(t.fullname)
+            if t.fullname in root.__target_fullnames and not self.__is_wrapper(cls, self.__targets):
+                raise RuntimeError(f'duplicate target name: {t.fullname}')
+            root.__target_fullnames.add(t.fullname)
             self.__targets.add(t)
-            self.__find.cache_clear()
-            for parent in self.parents:
-                parent.__find.cache_clear()
+            self.__index_target(t)
         if issubclass(cls, Test):
-            # if t.fullname in MakeFile.__test_fullnames:
-            #     raise RuntimeError(f'duplicate test name: {t.fullname}')
-            MakeFile.__test_fullnames.append(t.fullname)
+            if t.fullname in root.__test_fullnames and not self.__is_wrapper(cls, self.__tests):
+                raise RuntimeError(f'duplicate test name: {t.fullname}')
+            root.__test_fullnames.add(t.fullname)
             self.__tests.add(t)
+        self.__bump_rev()
         return cls
 
     def wraps(self, cls: type[Target]):
@@ -93,28 +105,39 @@ class MakeFile(sys.__class__, Logging):
                 if type(t) == cls:
                     stream = t._stream
                     self.__targets.remove(t)
+                    self.__unindex_target(t)
                     new_instance = self.__find(new_cls)
+                    self.__index_target(new_instance)
                     new_instance._stream = stream
+                    self.__bump_rev()
                     return new_cls
             assert False, 'Original target has not been registered'
         return decorator
 
 
-    @functools.cache
+    @property
+    def __indexing_chain(self):
+        """This makefile and the parents whose subtree contains it"""
+        m = self
+        while m is not None:
+            yield m
+            if not m.__is_child:
+                break
+            m = m.parent
+
+    def __index_target(self, t: Target):
+        for m in self.__indexing_chain:
+            for name in t.provides:
+                m.__index.setdefault(name, t)
+            m.__index.setdefault(type(t), t)
+
+    def __unindex_target(self, t: Target):
+        for m in self.__indexing_chain:
+            for key in [k for k, v in m.__index.items() if v is t]:
+                del m.__index[key]
+
     def __find(self, name_or_class) -> Target:
-        if isinstance(name_or_class, type):
-            def check(t: Target):
-                return type(t) == name_or_class
-        else:
-            def check(t: Target):
-                return name_or_class in t.provides
-        for t in self.__targets:
-            if check(t):
-                return t
-        for c in self.children:
-            t = c.__find(name_or_class)
-            if t:
-                return t
+        return self.__index.get(name_or_class)
 
     def find(self, name_or_class) -> Target:
         """Find a target.
@@ -128,6 +151,11 @@ class MakeFile(sys.__class__, Logging):
         t = self.__find(name_or_class)
         if t is not None:
             return t
+
+        if isinstance(name_or_class, str):
+            t = self.targets_by_fullname.get(name_or_class)
+            if t is not None:
+                return t
         
         if self.parent:
             return self.parent.find(name_or_class)
@@ -147,10 +175,12 @@ class MakeFile(sys.__class__, Logging):
     @property
     def pkgs_path(self):
         if self.__pkgs_path is None:
-            if self.requirements:
-                return self.requirements.parent.build_path / 'pkgs'
-            else:
-                return self.build_path / 'pkgs'
+            if self.__default_pkgs_path is None:
+                if self.requirements:
+                    self.__default_pkgs_path = self.requirements.parent.build_path / 'pkgs'
+                else:
+                    self.__default_pkgs_path = self.build_path / 'pkgs'
+            return self.__default_pkgs_path
         else:
             return self.__pkgs_path
         
@@ -161,49 +191,76 @@ class MakeFile(sys.__class__, Logging):
     @requirements.setter
     def requirements(self, value: 'MakeFile'):
         self.__requirements = value
+        self.__default_pkgs_path = None
+
+    def __bump_rev(self):
+        """Invalidate the aggregated (all_*) views of the whole tree"""
+        self.root.__agg_rev += 1
+
+    def __aggregate(self, key: str, compute: t.Callable[[], t.Any]):
+        """Memoize compute() until the next registration in the tree"""
+        rev = self.root.__agg_rev
+        cached = self.__agg_cache.get(key)
+        if cached is None or cached[0] != rev:
+            cached = (rev, compute())
+            self.__agg_cache[key] = cached
+        return cached[1]
 
     @property
     def targets(self) -> set[Target]:
         return {t for t in self.__targets if self.is_requirement == t.is_requirement}
 
-    @property
-    def all_targets(self) -> set[Target]:
+    def __all_targets(self):
         targets = self.targets
         for c in self.children:
             if self.is_requirement == c.is_requirement:
                 targets.update(c.all_targets)
         return targets
 
+    @property
+    def all_targets(self) -> set[Target]:
+        return self.__aggregate('targets', self.__all_targets)
+
+    @property
+    def targets_by_fullname(self) -> dict[str, Target]:
+        return self.__aggregate('targets_by_fullname', lambda: {t.fullname: t for t in self.all_targets})
+
     @property
     def tests(self) -> set[Test]:
         return self.__tests
 
-    @property
-    def all_tests(self) -> set[Test]:
-        tests = self.tests
+    def __all_tests(self):
+        tests = set(self.tests)
         for c in self.children:
             tests.update(c.all_tests)
         return tests
 
     @property
-    def executables(self):
-        from dan.cxx import Executable
-        return [target for target in self.targets if issubclass(target, Executable)]
+    def all_tests(self) -> set[Test]:
+        return self.__aggregate('tests', self.__all_tests)
 
     @property
-    def all_executables(self):
+    def executables(self) -> set[Target]:
+        from dan.cxx import Executable
+        return {target for target in self.targets if isinstance(target, Executable)}
+
+    def __all_executables(self):
         executables = self.executables
         for c in self.children:
             executables.update(c.all_executables)
         return executables
 
+    @property
+    def all_executables(self) -> set[Target]:
+        return self.__aggregate('executables', self.__all_executables)
+
     @property
     def installed(self):
         return [target for target in self.targets if target.installed == True]
 
     @property
     def all_installed(self):
-        return [target for target in self.all_targets if target.installed == True]
+        return self.__aggregate('installed', lambda: [target for target in self.all_targets if target.installed == True])
 
     @property
     def default(self):
@@ -211,7 +268,7 @@ class MakeFile(sys.__class__, Logging):
 
     @property
     def all_default(self):
-        return [target for target in self.all_targets if target.default == True]
+        return self.__aggregate('default', lambda: [target for target in self.all_targets if target.default == True])
     
     @cached_property
     def root(self):
@@ -3,9 +3,25 @@ import pathlib
 
 Path = type(pathlib.Path())
 
+
+_no_default = object()
+
+def mtime(path: str | os.PathLike, default: float = _no_default) -> float:
+    """Modification time of path, straight from os.stat
+
+    :param default: Returned when path does not exist (the OSError is raised otherwise).
+    """
+    try:
+        return os.stat(path).st_mtime
+    except (FileNotFoundError, NotADirectoryError):
+        if default is _no_default:
+            raise
+        return default
+
+
 @property
 def modification_time(self):
-    return self.stat().st_mtime
+    return os.stat(self).st_mtime
 
 Path.modification_time = modification_time
 
@@ -8,6 +8,7 @@ from dan.core.settings import InstallMode, InstallSettings
 from dan.core.version import VersionSpec
 from dan.logging import Logging
 
+@functools.lru_cache(maxsize=None)
 def parse_package(name: str) -> tuple[str, str, str]:
     """Parse package name
     
@@ -104,13 +105,14 @@ class RequiredPackage(Logging):
         return f'{self} at {hex(id(self))}'
     
 
+@functools.lru_cache(maxsize=None)
+def _parse_specification(req: str) -> tuple[str, VersionSpec | None]:
+    return VersionSpec.parse(req.strip())
+
 def parse_requirement(req: str) -> RequiredPackage:
-    req = req.strip()
-    name, spec = VersionSpec.parse(req)
-    if spec:
-        return RequiredPackage(name, spec)
-    else:
-        return RequiredPackage(req)
+    # RequiredPackage gets resolved in place (target), only the parsed specification is shared
+    name, spec = _parse_specification(req)
+    return RequiredPackage(name, spec)
 
 async def load_requirements(requirements: t.Iterable[RequiredPackage], makefile, name=None, logger = None, install = True):
 
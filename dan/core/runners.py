@@ -77,15 +77,25 @@ class AsyncStreamProducer:
 
 
 _jobs_sem: asyncio.Semaphore = None
+_jobs_configured = False
 
 
 def max_jobs(count=1):
     global _jobs_sem
+    global _jobs_configured
+    _jobs_configured = True
     if count > 0:
         _jobs_sem = asyncio.Semaphore(count)
     else:
         _jobs_sem = None
 
+
+def _get_jobs_sem():
+    # bounded to the cpu count unless explicitly configured (max_jobs(0) disables the bound)
+    if not _jobs_configured:
+        max_jobs(os.cpu_count() or 1)
+    return _jobs_sem
+
 def cmdline2list(s: str):
     """
     Translate a command line string into a sequence of arguments,
@@ -164,10 +174,15 @@ def list2cmdline(command: list|str):
     return command
 
 
-async def async_run(command, log=True, logger: logging.Logger = None, no_raise=False, env=None, cwd=None, out_capture=None, err_capture=None, all_capture=None, input: str = None) -> tuple[str, str, int]:
-    if _jobs_sem is not None:
-        await _jobs_sem.acquire()
+async def async_run(command, log=True, logger: logging.Logger = None, no_raise=False, env=None, cwd=None, out_capture=None, err_capture=None, all_capture=None, input: str = None, shell=True) -> tuple[str, str, int]:
+    jobs_sem = _get_jobs_sem()
+    if jobs_sem is not None:
+        await jobs_sem.acquire()
     try:
+        # argument lists can be executed directly, sparing a shell per process
+        exec_args = None
+        if not shell and isinstance(command, list):
+            exec_args = [part.as_posix() if isinstance(part, Path) else str(part) for part in command]
         command = list2cmdline(command)
         if env is not None:
             e = dict(os.environ)
@@ -180,12 +195,20 @@ async def async_run(command, log=True, logger: logging.Logger = None, no_raise=F
             stdin = None
         if logger is not None:
             logger.debug('executing: %s', command)
-        proc = await asyncio.subprocess.create_subprocess_shell(command,
-                                                                stdout=asyncio.subprocess.PIPE,
-                                                                stderr=asyncio.subprocess.PIPE,
-                                                                stdin=stdin,
-                                                                env=env,
-                                                                cwd=cwd)
+        if exec_args is not None:
+            proc = await asyncio.subprocess.create_subprocess_exec(*exec_args,
+                                                                   stdout=asyncio.subprocess.PIPE,
+                                                                   stderr=asyncio.subprocess.PIPE,
+                                                                   stdin=stdin,
+                                                                   env=env,
+                                                                   cwd=cwd)
+        else:
+            proc = await asyncio.subprocess.create_subprocess_shell(command,
+                                                                    stdout=asyncio.subprocess.PIPE,
+                                                                    stderr=asyncio.subprocess.PIPE,
+                                                                    stdin=stdin,
+                                                                    env=env,
+                                                                    cwd=cwd)
         out = io.StringIO()
         err = io.StringIO()
         outs = [out]
@@ -234,24 +257,27 @@ async def async_run(command, log=True, logger: logging.Logger = None, no_raise=F
             raise CommandError(message, proc.returncode, out, err)
         return out, err, proc.returncode
     finally:
-        if _jobs_sem is not None:
-            _jobs_sem.release()
+        if jobs_sem is not None:
+            jobs_sem.release()
 
 
 def sync_run(command, pipe=True, logger: logging.Logger = None, no_raise=False, shell=True, env=None, cwd=None):
+    exec_args = None
+    if not shell and isinstance(command, list):
+        exec_args = [part.as_posix() if isinstance(part, Path) else str(part) for part in command]
     command = list2cmdline(command)
     if pipe:
         stdout = subprocess.PIPE
     else:
         stdout = None
     if logger:
-        logger.debug(f'executing: {command}')
+        logger.debug('executing: %s', command)
     if env:
         e = dict(os.environ)
         for k, v in env.items():
             e[k] = v
         env = e
-    proc = subprocess.Popen(command,
+    proc = subprocess.Popen(command if exec_args is None else exec_args,
                             stdout=stdout,
                             stderr=stdout,
                             shell=shell,
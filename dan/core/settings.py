@@ -107,9 +107,11 @@ def _parse_str_value(name, value: str, orig: type, tp: type = None):
             raise TypeError(f'unhandled type {orig}[{tp}]')
         return orig(value)
 
+_INPUT_RE = re.compile(r'(.+?)([+-])?="?(.+)"?')
+
 def _apply_inputs(inputs: list[str], get_item: t.Callable[[str], tuple[t.Any, t.Any, t.Any]], logger = None, input_type_name='setting'):
     for input in inputs:
-        m = re.match(r'(.+?)([+-])?="?(.+)"?', input)
+        m = _INPUT_RE.match(input)
         if m:
             name = m[1]
             op = m[2]
@@ -166,13 +168,20 @@ def _apply_inputs(inputs: list[str], get_item: t.Callable[[str], tuple[t.Any, t.
 
 
 def apply_settings(base, *settings, logger=None):
+    # resolved parent settings, by path
+    parents: dict[tuple[str, ...], t.Any] = {(): base}
+
     def get_setting(name):
         parts = name.split('.')
-        setting = base
-        for part in parts[:-1]:
-            if not hasattr(setting, part):
-                raise RuntimeError(f'no such setting: {name}')
-            setting = getattr(setting, part)
+        path = tuple(parts[:-1])
+        setting = parents.get(path)
+        if setting is None:
+            setting = base
+            for part in path:
+                if not hasattr(setting, part):
+                    raise RuntimeError(f'no such setting: {name}')
+                setting = getattr(setting, part)
+            parents[path] = setting
         if not hasattr(setting, parts[-1]):
             raise RuntimeError(f'no such setting: {name}')
         value = getattr(setting, parts[-1])
@@ -2,26 +2,95 @@ import collections
 import contextlib
 from functools import cached_property
 import functools
+import hashlib
 from dan.core.register import MakefileRegister
-from dan.core.pathlib import Path
+from dan.core.pathlib import Path, mtime
 from typing import Any, Callable, Iterable, Union, TypeAlias
 import inspect
+import os
+import sys
 
 from dan.core import asyncio, aiofiles, utils, diagnostics as diags
-from dan.core.requirements import load_requirements
+from dan.core.requirements import RequiredPackage, load_requirements, parse_requirement
+from dan.core.runners import async_run
 from dan.core.settings import InstallMode, InstallSettings, safe_load
 from dan.core.version import Version
 from dan.logging import Logging
 from dan.core.terminal import TermStream
 
 
+_dir_entries: dict[str, dict[str, os.DirEntry]] = dict()
+_mtimes: dict[str, float | None] = dict()
+
+
+def new_build_epoch():
+    """Start a new build session, invalidating the modification times memoized during the previous one"""
+    _dir_entries.clear()
+    _mtimes.clear()
+
+
+def files_changed(paths: Iterable[Path | str]):
+    """Invalidate what was memoized about paths written during the current build epoch (eg.: a target's outputs)
+
+    Drops their modification times and the listings of their directories, other paths keep their memoized values.
+    """
+    for path in paths:
+        path = os.fspath(path)
+        _mtimes.pop(path, None)
+        _dir_entries.pop(os.path.dirname(path), None)
+
+
+def _memoized_mtime(path) -> float | None:
+    """Modification time of path (None when missing), resolved once per build epoch"""
+    path = os.fspath(path)
+    try:
+        return _mtimes[path]
+    except KeyError:
+        value = _mtimes[path] = _scanned_mtime(path, None)
+        return value
+
+
+def _scanned_mtime(path, default):
+    """Modification time of path, listing its parent directory once per build epoch
+
+    Missing files are resolved from the listing without any stat call.
+    """
+    parent, name = os.path.split(path)
+    entries = _dir_entries.get(parent)
+    if entries is None:
+        try:
+            with os.scandir(parent or '.') as it:
+                entries = {entry.name: entry for entry in it}
+        except (FileNotFoundError, NotADirectoryError):
+            entries = dict()
+        _dir_entries[parent] = entries
+    entry = entries.get(name)
+    if entry is None:
+        return default
+    try:
+        return entry.stat().st_mtime
+    except FileNotFoundError:
+        return default
+
+
 class Dependencies:
+    __slots__ = ('parent', '_public', '_private', '_public_set', '_private_set', '_public_by_name', '_private_by_name',
+                 '_targets', '_files', '_requires')
 
     def __init__(self, parent: 'Target', public: Iterable = None, private: Iterable = None):
         super().__init__()
         self.parent = parent
         self._public = list()
         self._private = list()
+        # membership checks without scanning the ordered lists
+        self._public_set = set()
+        self._private_set = set()
+        self._public_by_name = dict()
+        self._private_by_name = dict()
+        # typed buckets (private and public), filled by add()
+        self._targets: list[Target] = list()
+        self._files: list[FileDependency] = list()
+        self._requires: list[RequiredPackage] = list()
         if public is not None:
             self.update(public, public=True)
         if private is not None:
@@ -32,41 +101,46 @@ class Dependencies:
         return self.parent.makefile
 
     def add(self, dependency, public=True):
-        content = self._public if public else self._private
-        if dependency in content:
+        content_set = self._public_set if public else self._private_set
+        if dependency in content_set:
             return
-        from dan.pkgconfig.package import RequiredPackage
         match dependency:
             case Target() | FileDependency():
-                content.append(dependency)
+                dep = dependency
             case type():
                 assert issubclass(dependency, Target)
                 dep = self.makefile.find(dependency)
                 if dep is None:
                     raise RuntimeError(f'cannot find dependency class: {dependency.__name__}')
-                content.append(dep)
             case str():
                 from dan.pkgconfig.package import PackageConfig
-                for pkg in PackageConfig.all.values():
-                    if pkg.name == dependency:
-                        content.append(pkg)
-                        break
-                else:
+                dep = PackageConfig.by_name.get(dependency)
+                if dep is None:
                     if isinstance(self.parent.source_path, Path) and Path(self.parent.source_path / dependency).exists():
-                        content.append(FileDependency(
-                            self.parent.source_path / dependency))
+                        dep = FileDependency(self.parent.source_path / dependency)
                     else:
-                        from dan.pkgconfig.package import parse_requirement
-                        content.append(parse_requirement(dependency))
+                        dep = parse_requirement(dependency)
             case Path():
-                dependency = FileDependency(
-                    self.parent.source_path / dependency)
-                content.append(dependency)
+                dep = FileDependency(self.parent.source_path / dependency)
             case RequiredPackage():
-                content.append(dependency)
+                dep = dependency
             case _:
                 raise RuntimeError(
                     f'Unhandled dependency {dependency} ({type(dependency)})')
+        if dep in content_set:
+            return
+        content_set.add(dep)
+        (self._public if public else self._private).append(dep)
+        by_name = self._public_by_name if public else self._private_by_name
+        by_name.setdefault(dep.name, dep)
+        match dep:
+            case Target():
+                self._targets.append(dep)
+            case FileDependency():
+                self._files.append(dep)
+            case RequiredPackage():
+                self._requires.append(dep)
+        self.parent._invalidate_dependency_caches()
 
     def update(self, dependencies, public=True):
         match dependencies:
@@ -82,12 +156,10 @@ class Dependencies:
                 raise RuntimeError('unhandled')
 
     def __getattr__(self, attr):
-        for item in self._public:
-            if item.name == attr:
-                return item
-        for item in self._private:
-            if item.name == attr:
-                return item
+        item = self._public_by_name.get(attr)
+        if item is None:
+            item = self._private_by_name.get(attr)
+        return item
     
     @property
     def public(self):
@@ -109,6 +181,19 @@ class Dependencies:
                 return False
         return True
 
+    def outdated_since(self, t: float) -> bool:
+        """Whether a dependency is not up-to-date or was modified after t
+
+        Single pass equivalent of checking up_to_date, then modification_time.
+        """
+        for item in self.all:
+            if not item.up_to_date:
+                return True
+            mt = item.modification_time
+            if mt and mt > t:
+                return True
+        return False
+
     @property
     def modification_time(self):
         t = 0.0
@@ -132,11 +217,15 @@ class FileDependency(PathImpl):
 
     @property
     def up_to_date(self):
-        return self.exists()
+        return _memoized_mtime(self) is not None
 
     @property
     def modification_time(self):
-        return self.stat().st_mtime
+        value = _memoized_mtime(self)
+        if value is None:
+            # missing file: let mtime raise
+            return mtime(self)
+        return value
 
 
 class Option:
@@ -183,36 +272,55 @@ class Option:
         if self.__value != value:
             self.__value = value
             self.__cache[self.name] = value
+            self.__parent._invalidate()
 
 
 class Options:
     def __init__(self, parent: 'Target', default: dict[str, Any] = dict()) -> None:
         self.__parent = parent
-        cache = parent.cache
-        if isinstance(parent.cache, dict):
-            if not parent.name in cache:
-                cache[parent.name] = dict()
-            cache = cache[parent.name]
-        else:
-            cache = parent.cache.data
-        if not 'options' in cache:
-            cache['options'] = dict()
-        self._cache = cache['options']
+        self.__cache: dict = None
         self.__items: list[Option] = list()
+        # indexed by both name and fullname
+        self.__by_name: dict[str, Option] = dict()
+        self.__sha1: str = None
         self.update(default)
 
+    def _invalidate(self):
+        """Called by Option when its value changes"""
+        self.__sha1 = None
+
+    @property
+    def _cache(self) -> dict:
+        # resolved on first option access, avoids loading the parent's cache for option-less targets
+        if self.__cache is None:
+            parent = self.__parent
+            cache = parent.cache
+            if isinstance(cache, dict):
+                if not parent.name in cache:
+                    cache[parent.name] = dict()
+                cache = cache[parent.name]
+            else:
+                cache = cache.data
+            if not 'options' in cache:
+                cache['options'] = dict()
+            self.__cache = cache['options']
+        return self.__cache
+
     def add(self, name: str, default_value, help=None):
         if self.get(name, False) is not None:
             raise RuntimeError(f'duplicate options detected ({name})')
         opt = Option(self, f'{self.__parent.fullname}.{name}',
                      default_value, help=help)
         self.__items.append(opt)
+        self.__by_name.setdefault(opt.name, opt)
+        self.__by_name.setdefault(opt.fullname, opt)
+        self.__sha1 = None
         return opt
 
     def get(self, name: str, parent_lookup = True):
-        for o in self.__items:
-            if name in {o.name, o.fullname}:
-                return o
+        opt = self.__by_name.get(name)
+        if opt is not None:
+            return opt
         if parent_lookup and self.__parent.parent is not None:
             return self.__parent.parent.options.get(name)
 
@@ -235,11 +343,12 @@ class Options:
     
     @property
     def sha1(self):
-        import hashlib
-        sha1 = hashlib.sha1()
-        for o in self.__items:
-            sha1.update(o.fullname.encode() + str(o.value).encode())
-        return sha1.hexdigest()
+        if self.__sha1 is None:
+            sha1 = hashlib.sha1()
+            for o in self.__items:
+                sha1.update(o.fullname.encode() + str(o.value).encode())
+            self.__sha1 = sha1.hexdigest()
+        return self.__sha1
 
     def items(self):
         for o in self.__items:
@@ -270,7 +379,12 @@ class Installer:
             dest /= subdir
         if isinstance(src, Path):
             dest /= src.name
-            if dest.exists() and dest.younger_than(src):
+            # stats run off the event loop: concurrent installs do not serialize on (possibly remote) filesystems
+            status = await aiofiles.is_up_to_date_copy(src, dest)
+            if status != aiofiles.CopyStatus.outdated:
+                if status == aiofiles.CopyStatus.same_content:
+                    # only the mtime changed (relink, checkout...): keep the installed file
+                    await asyncio.to_thread(os.utime, dest)
                 self._logger.info('%s is up-to-date', dest)
                 self.installed_files.append(dest)
                 return
@@ -279,8 +393,7 @@ class Installer:
         else:
             dest.parent.mkdir(parents=True, exist_ok=True)
             self._logger.debug('installing: %s', dest)
-            async with aiofiles.open(dest, 'w') as f:
-                await f.write(src)
+            await aiofiles.write_file(dest, src)
         self.installed_files.append(dest)
 
     @property
@@ -437,7 +550,7 @@ class Target(Logging, MakefileRegister, internal=True):
 
         if parent is not None:
             self.makefile = parent.makefile
-            self.fullname = f'{parent.fullname}.{self.name}'
+            self.fullname = sys.intern(f'{parent.fullname}.{self.name}')
             self._stream = parent._stream.sub(stream_name)
         else:
             self._stream = TermStream(stream_name)
@@ -450,7 +563,7 @@ class Target(Logging, MakefileRegister, internal=True):
 
 
         if self.fullname is None:
-            self.fullname = f'{self.makefile.fullname}.{self.name}'
+            self.fullname = sys.intern(f'{self.makefile.fullname}.{self.name}')
 
         self.options = Options(self, self.options)
 
@@ -553,14 +666,13 @@ class Target(Logging, MakefileRegister, internal=True):
         return build_path
         
     
-    @property
-    def requires(self):
-        from dan.pkgconfig.package import RequiredPackage
-        return [dep for dep in self.dependencies.all if isinstance(dep, RequiredPackage)]
+    def _invalidate_dependency_caches(self):
+        for name in ('requires', 'target_dependencies', 'file_dependencies'):
+            self.__dict__.pop(name, None)
 
     @cached_property
-    def fullname(self) -> str:
-        return f'{self.makefile.fullname}.{self.name}'
+    def requires(self):
+        return list(self.dependencies._requires)
 
     @property
     def cache(self) -> dict:
@@ -647,19 +759,21 @@ class Target(Logging, MakefileRegister, internal=True):
 
         return await asyncio.may_await(self.__initialize__())
 
+    def __output_mtime(self):
+        # memoized per build epoch: each dependent target would stat the output again
+        output = self.build_path / f'{self.name}.stamp' if self.output is None else self.output
+        return _memoized_mtime(output)
+
     @property
     def modification_time(self):
-        output = self.build_path / f'{self.name}.stamp' if self.output is None else self.output  
-        return output.stat().st_mtime if output.exists() else 0.0
+        output_mtime = self.__output_mtime()
+        return 0.0 if output_mtime is None else output_mtime
 
     @cached_property
     def up_to_date(self):
-        output = self.build_path / f'{self.name}.stamp' if self.output is None else self.output
-        if output and not output.exists():
-            return False
-        elif not self.dependencies.up_to_date:
+        if self.__output_mtime() is None:
             return False
-        elif self.dependencies.modification_time > self.modification_time:
+        elif self.dependencies.outdated_since(self.modification_time):
             return False
         elif 'options_sha1' in self.cache and self.cache['options_sha1'] != self.options.sha1:
             return False
@@ -696,8 +810,12 @@ class Target(Logging, MakefileRegister, internal=True):
                 self.diagnostics.clear()
             try:
                 result = await asyncio.may_await(self.__build__())
+                output = self.build_path / f'{self.name}.stamp' if self.output is None else self.output
                 if self.output is None:
-                    (self.build_path / f'{self.name}.stamp').touch()
+                    output.touch()
+                # dependents (and other targets sharing these directories) must see the new files
+                files_changed([output, *self.other_generated_files])
+                _mtimes[os.fspath(output)] = mtime(output, None)
                 self.cache['options_sha1'] = self.options.sha1
                 self.trace('built')
                 self.status('built', icon='✔')
@@ -712,28 +830,26 @@ class Target(Logging, MakefileRegister, internal=True):
                 raise err
 
 
-    @property
+    @cached_property
     def target_dependencies(self):
-        return [t for t in {*self.dependencies.all, *self.preload_dependencies.all} if isinstance(t, Target)]
+        return list(dict.fromkeys([*self.dependencies._targets, *self.preload_dependencies._targets]))
 
-    @property
+    @cached_property
     def file_dependencies(self):
-        return [t for t in self.dependencies.all if isinstance(t, FileDependency)]
+        return list(self.dependencies._files)
 
     @asyncio.cached
     async def clean(self):
         await self.initialize()
         async with asyncio.TaskGroup(f'cleaning {self.name} outputs') as group:
             output = self.build_path / f'{self.name}.stamp' if self.output is None else self.output
-            if output and output.exists():
-                self.info('debug...')
-                if output.is_dir():
-                    group.create_task(aiofiles.rmtree(output, force=True))
-                else:
-                    group.create_task(aiofiles.os.remove(output))
-            for f in self.other_generated_files:
-                if f.exists():
-                    group.create_task(aiofiles.os.remove(f))
+            files = list(self.other_generated_files)
+            if output.is_dir():
+                group.create_task(aiofiles.rmtree(output, force=True))
+            else:
+                files.append(output)
+            # one thread dispatch for all files, missing ones are skipped
+            group.create_task(aiofiles.remove_files(files))
             group.create_task(asyncio.may_await(self.__clean__()))
 
     @asyncio.cached(unique = True)
@@ -768,7 +884,6 @@ class Target(Logging, MakefileRegister, internal=True):
 
     def get_dependency(self, dep: str | type, recursive=True) -> TargetDependencyLike:
         dependency = self.__get_dependency(dep, recursive)
-        from dan.core.requirements import RequiredPackage
         match dependency:
             case RequiredPackage():
                 if dependency.target is not None:
@@ -822,7 +937,6 @@ class Target(Logging, MakefileRegister, internal=True):
         return fn
 
     async def run(self, command, cwd=None, env=None, **kwargs):
-        from dan.core.runners import async_run
         kwargs['logger'] = self
         if cwd is None:
             cwd = self.build_path
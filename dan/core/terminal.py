@@ -1,5 +1,7 @@
 import atexit
+import functools
 import math
+import signal
 import time
 import typing as t
 import sys
@@ -24,6 +26,47 @@ class TerminalMode(enum.Enum):
 mode = TerminalMode.STICKY
 
 
+@functools.cache
+def _terminal_size() -> tuple[int, int]:
+    return shutil.get_terminal_size()
+
+
+_previous_resize_handler = None
+_resize_handler_installed = False
+
+
+def _on_resize(signum, frame):
+    _terminal_size.cache_clear()
+    if callable(_previous_resize_handler):
+        _previous_resize_handler(signum, frame)
+
+
+def _install_resize_handler():
+    """Track terminal resizes (chaining the previous SIGWINCH handler), installed while the terminal manager runs"""
+    global _previous_resize_handler, _resize_handler_installed
+    if _resize_handler_installed or not hasattr(signal, 'SIGWINCH'):
+        return
+    try:
+        _previous_resize_handler = signal.signal(signal.SIGWINCH, _on_resize)
+    except ValueError:
+        # not in main thread: size is not cached across resizes then
+        return
+    _resize_handler_installed = True
+
+
+def _restore_resize_handler():
+    global _previous_resize_handler, _resize_handler_installed
+    if not _resize_handler_installed:
+        return
+    try:
+        signal.signal(signal.SIGWINCH, _previous_resize_handler if _previous_resize_handler is not None else signal.SIG_DFL)
+    except ValueError:
+        return
+    _previous_resize_handler = None
+    _resize_handler_installed = False
+    _terminal_size.cache_clear()
+
+
 def set_mode(new_mode: TerminalMode):
     global mode
     global _manager
@@ -143,6 +186,8 @@ class TermSequence:
 
 class _OutputStreamProgress:
     UTF = " " + "".join(map(chr, range(0x258F, 0x2587, -1)))
+    min_interval = 0.1
+    """Minimum delay (in seconds) between two progress-triggered refreshes"""
 
     def __init__(
         self, stream: "TermStream", status: str, total=None, auto_update=True
@@ -157,6 +202,7 @@ class _OutputStreamProgress:
         self._auto_update = auto_update
         self._auto_update_task = None
         self._done = False
+        self._last_refresh = 0.0
 
     async def __auto_update(self):
         while True:
@@ -193,12 +239,19 @@ class _OutputStreamProgress:
             self._s._extra = self._saved_extra
         self._s.update()
 
+    def _refresh(self, now: float, force=False):
+        # coalesce refreshes, the final one (n == total) always goes through
+        if force or now - self._last_refresh >= self.min_interval or self.n == self.total:
+            self._last_refresh = now
+            self._s.update()
+
     def __call__(self, n=1, status=None):
-        self._elapsed_s = time.time() - self._t_start
+        now = time.time()
+        self._elapsed_s = now - self._t_start
         self.n += n
         if status is not None:
             self._s._status = self._status = status
-        self._s.update()
+        self._refresh(now, force=status is not None)
 
     def __make_bar(self, frac, width):
         nsyms = len(self.UTF) - 1
@@ -253,17 +306,19 @@ class _TaskGroup(asyncio.TaskGroup, _OutputStreamProgress):
         _OutputStreamProgress.__init__(self, stream, status=name, **kwargs)
         asyncio.TaskGroup.__init__(self, name)
 
-    def __notify_bar_task_done(self, task):
-        self._elapsed_s = time.time() - self._t_start
-        self.n += 1
-        self._s.update()
+    def _on_task_done(self, task):
+        super()._on_task_done(task)
+        # total is known once the group is exiting, earlier completions are not part of the bar
+        if self.total is not None:
+            now = time.time()
+            self._elapsed_s = now - self._t_start
+            self.n += 1
+            self._refresh(now)
 
     async def __aexit__(self, et, exc, tb):
         total = len(self._tasks)
         if total:
             self.total = total
-            for task in self._tasks:
-                task.add_done_callback(self.__notify_bar_task_done)
             self._s.update()
         _OutputStreamProgress.__enter__(self)
         result = await asyncio.TaskGroup.__aexit__(self, et, exc, tb)
@@ -326,6 +381,8 @@ class TermStream:
         self._extra: str = ""
         self.theme = theme or default_theme
         self._cached_out: list[str] = list()
+        # colored "<icon>  <name>: " prefix, only re-rendered when the icon changes
+        self._prefix: tuple[str, str] = None
         self._mngr = manager()
         self._hide_task: asyncio.Task = None
         self._offset = 0
@@ -442,7 +499,9 @@ class TermStream:
 
     def _get_output_default(self, now) -> list[str]:
         if self._dirty:
-            prefix = f"{' ' * self._offset}{self.theme.icon(self._icon)}  {self.theme.name(self.name)}: "
+            if self._prefix is None or self._prefix[0] != self._icon:
+                self._prefix = (self._icon, f"{' ' * self._offset}{self.theme.icon(self._icon)}  {self.theme.name(self.name)}: ")
+            prefix = self._prefix[1]
             extra = str(self._extra)
             status = self._status.replace('\n', ' ') # TODO handle multiline status
             max_status_len = self.prefix_width - (len(extra)) - 1
@@ -491,15 +550,16 @@ class _TermManager:
 
     @property
     def height(self):
-        return shutil.get_terminal_size()[1]
+        return _terminal_size()[1] if _resize_handler_installed else shutil.get_terminal_size()[1]
 
     @property
     def width(self):
-        return shutil.get_terminal_size()[0]
+        return _terminal_size()[0] if _resize_handler_installed else shutil.get_terminal_size()[0]
 
     def start(self):
         if self._thread is not None:
             self.stop()
+        _install_resize_handler()
         try:
             loop = asyncio.get_running_loop()
             self._thread = asyncio.create_task(self._render(), name="terminal-rendering")
@@ -507,6 +567,7 @@ class _TermManager:
             pass
 
     def stop(self):
+        _restore_resize_handler()
         if self._thread is not None:
             self._stop_requested = True
             self._up_ev.set()
@@ -3,7 +3,6 @@ import os
 import re
 import typing as t
 
-import aiofiles
 from dan.core import asyncio
 from dan.core.pathlib import Path
 from dan.core.register import MakefileRegister
@@ -83,11 +82,12 @@ class Test(Logging, MakefileRegister, internal=True):
         self.debug('testing %s', name)
         out, err, rc = await self.executable.execute(*args, no_raise=True, cwd=self.workingDir)
         out_log, out_err = self.outs(caze)
-        async with aiofiles.open(out_log, 'w') as outlog, \
-                aiofiles.open(out_err, 'w') as errlog:
-            async with asyncio.TaskGroup(f'writing {name} log files') as group:
-                group.create_task(outlog.write(out))
-                group.create_task(errlog.write(err))
+
+        def write_logs():
+            out_log.write_text(out)
+            out_err.write_text(err)
+
+        await asyncio.to_thread(write_logs)
         if rc != caze.expected_result:
             out = out.strip()
             err = err.strip()
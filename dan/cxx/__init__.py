@@ -1,10 +1,10 @@
+import importlib
 import sys
 from dan.core.cache import Cache
 
 from dan.core.errors import InvalidConfiguration
 from dan.core.settings import Settings
 from dan.cxx.toolchain import Toolchain, BuildType, CppStd
-from dan.cxx.detect import get_toolchains
 
 target_toolchain: Toolchain = None
 """The target toolchain.
@@ -35,11 +35,33 @@ sys.modules[__name__].__class__ = __LazyContext
 
 auto_fpic = True
 
+_toolchain_classes = {
+    'gcc': ('dan.cxx.unix_toolchain', 'UnixToolchain'),
+    'clang': ('dan.cxx.unix_toolchain', 'UnixToolchain'),
+    'msvc': ('dan.cxx.msvc_toolchain', 'MSVCToolchain'),
+}
+"""Toolchain type to (module, class) mapping.
+
+Toolchain modules are only imported when a toolchain of their type is used.
+"""
+
+def get_toolchains():
+    from dan.cxx.detect import get_toolchains
+    return get_toolchains()
+
+
 def get_default_toolchain(data = None):
     data = data or get_toolchains()
     return data['default']
 
 
+def get_toolchain_class(tc_type: str) -> type[Toolchain]:
+    if not tc_type in _toolchain_classes:
+        raise InvalidConfiguration(f'Unhandeld toolchain type: {tc_type}')
+    module_name, class_name = _toolchain_classes[tc_type]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
 def init_toolchains(name: str = None, settings: Settings = None):
     data = get_toolchains()
     if name is None or name == 'default':
@@ -47,16 +69,7 @@ def init_toolchains(name: str = None, settings: Settings = None):
 
     toolchain_data = data['toolchains'][name]
 
-    tc_type = toolchain_data['type']
-    match tc_type:
-        case 'gcc' | 'clang':
-            from .unix_toolchain import UnixToolchain
-            tc_type = UnixToolchain
-        case 'msvc':
-            from .msvc_toolchain import MSVCToolchain
-            tc_type = MSVCToolchain
-        case _:
-            raise InvalidConfiguration(f'Unhandeld toolchain type: {tc_type}')
+    tc_type = get_toolchain_class(toolchain_data['type'])
     target_settings = settings.target
     cache = Cache.get('dan').data
     if not 'toolchains' in cache:
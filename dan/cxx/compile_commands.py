@@ -1,47 +1,129 @@
 
 import json
+import os
 from dan.core.pathlib import Path
 import subprocess
+import tempfile
+import typing as t
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+    _DecodeError = orjson.JSONDecodeError
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(data) -> bytes:
+        return json.dumps(data).encode()
+
+    _DecodeError = json.JSONDecodeError
 
 
 class CompileCommands:
     def __init__(self, path) -> None:
         self.cc_path: Path = path / 'compile_commands.json'
-        if self.cc_path.exists():
-            with open(self.cc_path, 'r') as cc_f:
-                try:
-                    self.data = json.load(cc_f)
-                except json.JSONDecodeError:
-                    self.data = list()
-        else:
-            self.data = list()
+        # read at once, the file is never kept open (update() writes a new file)
+        try:
+            with open(self.cc_path, 'rb') as cc_f:
+                content = cc_f.read()
+        except FileNotFoundError:
+            content = None
             self.cc_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self._data = list() if not content else _loads(content)
+        except _DecodeError:
+            self._data = list()
+        # keep the last entry of each file (older databases may contain duplicates)
+        self._by_file: dict[str, dict] = {entry['file']: entry for entry in self._data}
+        self._dirty = len(self._by_file) != len(self._data)
+        if self._dirty:
+            self._data = list(self._by_file.values())
+        # inserts are only recorded during the build, then merged on access
+        # (file, build_path, to_command, content): arguments are only joined when merged
+        self._pending: list[tuple[Path, Path, t.Callable[[t.Any], str], list[str] | str]] = list()
+
+    @property
+    def data(self) -> list[dict]:
+        self._merge_pending()
+        return self._data
 
     def clear(self):
-        with open(self.cc_path, 'w'):
-            pass
+        self._pending.clear()
+        self._data = list()
+        self._by_file.clear()
+        self._dirty = True
+        self.update()
 
     def update(self):
-        with open(self.cc_path, 'w') as cc_f:
-            json.dump(self.data, cc_f)
+        self._merge_pending()
+        if not self._dirty:
+            return
+        # write aside (unique temporary file) then rename, an interrupted write cannot corrupt the database
+        with tempfile.NamedTemporaryFile(dir=self.cc_path.parent, prefix=f'{self.cc_path.name}.', suffix='.tmp', delete=False) as cc_f:
+            try:
+                # encoded entry by entry (one per line): the whole document is never held in memory
+                cc_f.write(b'[')
+                separator = b'\n'
+                for entry in self._data:
+                    cc_f.write(separator)
+                    cc_f.write(_dumps(entry))
+                    separator = b',\n'
+                cc_f.write(b'\n]\n')
+            except BaseException:
+                cc_f.close()
+                os.unlink(cc_f.name)
+                raise
+        try:
+            # temporary files are created private (0600)
+            os.chmod(cc_f.name, 0o644)
+            os.replace(cc_f.name, self.cc_path)
+        except BaseException:
+            os.unlink(cc_f.name)
+            raise
+        self._dirty = False
+
+    @staticmethod
+    def _key(file: Path) -> str:
+        return str(Path(file).resolve())
 
     def get(self, file: Path):
-        fname = file.name
-        for entry in self.data:
-            if entry['file'] == fname:
-                return entry
-        return None
+        self._merge_pending()
+        return self._by_file.get(self._key(file))
+
+    def insert_command(self, file: Path, build_path: Path, command: str):
+        self._pending.append((file, build_path, str, command))
+
+    def insert_args(self, file: Path, build_path: Path, args: list[str]):
+        self._pending.append((file, build_path, subprocess.list2cmdline, args))
 
     def insert(self, file: Path, build_path: Path, content: list[str] | str):
-        entry = self.get(file)
         if isinstance(content, list):
-            content = subprocess.list2cmdline(content)
+            self.insert_args(file, build_path, content)
+        else:
+            self.insert_command(file, build_path, content)
+
+    def _merge_pending(self):
+        pending = self._pending
+        if pending:
+            self._pending = list()
+            for file, build_path, to_command, content in pending:
+                self.__merge(file, build_path, to_command(content))
 
+    def __merge(self, file: Path, build_path: Path, content: str):
+        key = self._key(file)
+        entry = self._by_file.get(key)
         if entry:
-            entry['command'] = content
+            if entry['command'] != content:
+                entry['command'] = content
+                self._dirty = True
         else:
-            self.data.append({
-                'file': str(file),
+            entry = {
+                'file': key,
                 'directory': str(build_path),
                 'command': content
-            })
+            }
+            self._data.append(entry)
+            self._by_file[entry['file']] = entry
+            self._dirty = True
@@ -501,11 +501,11 @@ def create_toolchain(compiler: Compiler, logger=logging.getLogger('toolchain')):
         for toolname in toolnames:
             tool_path = (base_path / toolname).with_suffix(extension)
             if tool_path.exists():
-                logger.debug(f'found {tool} tool: {tool_path}')
+                logger.debug('found %s tool: %s', tool, tool_path)
                 data[tool] = str(tool_path)
                 return True
 
-        logger.debug(f'{tool} tool not found: {tool_path}')
+        logger.debug('%s tool not found: %s', tool, tool_path)
         return False
 
     if compiler.name == 'gcc':
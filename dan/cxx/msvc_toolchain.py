@@ -2,7 +2,6 @@ from functools import cached_property
 import json
 import typing as t
 
-import aiofiles
 from dan.core.runners import sync_run
 from dan.core.settings import BuildType
 from dan.core.utils import unique
@@ -10,6 +9,17 @@ from dan.cxx.toolchain import CommandArgsList, RuntimeType, Toolchain, Path, Fil
 from dan.core import diagnostics as diag
 from dan.core.pm import re_match
 import os
+import re
+
+
+_COMPILE_DIAG_RE = re.compile(
+    r'^[ \t]*(?P<filename>.+)\((?P<line>\d+)\):[ \t]+(?:fatal\s+)?(?P<severity>error|warning)\s(?P<code>\w+\d+):\s(?P<message>.+)$',
+    re.MULTILINE | re.ASCII)
+
+_LINK_DIAG_RE = re.compile(
+    r'^(?:(?P<filename>.+?)\s?:\serror\s(?P<code>\w+\d+):\s(?P<message>.+)'
+    r'|LINK\s?:\s?fatal\s+error\s+(?P<fatal_code>\w+\d+):\s+(?P<fatal_message>.+))$',
+    re.MULTILINE | re.ASCII)
 
 
 class MSVCToolchain(Toolchain):
@@ -66,7 +76,7 @@ class MSVCToolchain(Toolchain):
         return self._default_include_paths
 
     def has_cxx_compile_options(self, *opts) -> bool:
-        _, err, _ = sync_run([self.cxx, *opts], no_raise=True)
+        _, err, _ = sync_run([self.cxx, *opts], no_raise=True, shell=False)
         # D9002 => unknown option
         return err.splitlines()[0].find('D9002') == 0
 
@@ -140,13 +150,13 @@ class MSVCToolchain(Toolchain):
 
     async def scan_dependencies(self, sourcefile: Path, output: list[str], options: set[str]) -> set[FileDependency]:
         deps_path = output.with_suffix(".json")
-        deps = set()
-        if deps_path.exists():
-            async with aiofiles.open(deps_path, 'r') as f:
-                content = await f.read()
-                data = json.loads(content)
-                deps = set(data['Data']['Includes'])
-        return deps
+        # small and just written by the compiler: read inline rather than with three thread hops
+        try:
+            with open(deps_path, 'rb') as f:
+                data = json.loads(f.read())
+        except FileNotFoundError:
+            return set()
+        return set(data['Data']['Includes'])
 
     def compile_generated_files(self, output: Path) -> set[Path]:
         return {}
@@ -160,17 +170,24 @@ class MSVCToolchain(Toolchain):
     def cxxmodules_flags(self) -> list[str]:
         return list()
 
+    def make_compile_command_template(self, sourcefile: Path, options: list[str], build_type=None) -> list:
+        return [self.cc, *unique(self.common_flags, self.default_cflags, self.default_cxxflags, options)]
+
     def make_compile_commands(self, sourcefile: Path, output: Path, options: list[str], build_type=None) -> CommandArgsList:
         if build_type is None:
             build_type = self.build_type
         deps = output.parent / sourcefile.with_suffix(".json").name
-        args = [self.cc, *unique(self.common_flags, self.default_cflags, self.default_cxxflags, options),
+        args = [*self.compile_command_template(sourcefile, options, build_type),
                 '/sourceDependencies', deps,
                 f'/Fo{str(output)}', '/c', str(sourcefile)]
         if build_type.is_debug_mode:
             args.append(f'/Fd{str(output.with_suffix(".pdb"))}')
         return [args]
 
+    def make_preprocess_commands(self, sourcefile: Path, options: list[str]) -> CommandArgsList:
+        return [[self.cc, *unique(self.common_flags, self.default_cflags, self.default_cxxflags, options),
+                 '/EP', str(sourcefile)]]
+
     def make_link_commands(self, objects: set[Path], output: Path, options: list[str]) -> CommandArgsList:
         return [[self.lnk, *self.common_flags, *options, *objects, f'/OUT:{str(output)}']]
 
@@ -182,26 +199,18 @@ class MSVCToolchain(Toolchain):
                 f'/IMPLIB:{output.with_suffix(".lib")}', '/DLL', *options, *objects, f'/OUT:{output.with_suffix(".dll")}']]
 
     async def _handle_compile_output(self, lines) -> t.Iterable[diag.Diagnostic]:
-        async for line in lines:
-            line = line.strip()
-            match re_match(line):
-                case r'(.+)\((\d+)\):\s+(?:fatal\s+)?(error|warning)\s(\w+\d+):\s(.+)$' as m:
-                    yield diag.Diagnostic(
-                        message=m[5].strip(),
-                        range=diag.Range(start=diag.Position(line=int(m[2])-1)),
-                        code=m[4],
-                        severity=diag.Severity[m[3].upper()],
-                        source=self.type,
-                        filename=m[1])
-                case _:
-                    self._logger.debug('Unhandled line: %s', line)
+        for m in _COMPILE_DIAG_RE.finditer(await self._read_output(lines)):
+            yield diag.Diagnostic(
+                message=m['message'].strip(),
+                range=diag.Range(start=diag.Position(line=int(m['line'])-1)),
+                code=m['code'],
+                severity=diag.Severity[m['severity'].upper()],
+                source=self.type,
+                filename=m['filename'])
 
     async def _handle_link_output(self, lines) -> t.Iterable[diag.Diagnostic]:
-        async for line in lines:
-            match re_match(line):
-                case r'(.+?)\s?:\serror\s(\w+\d+):\s(.+)$' as m:
-                    yield diag.Diagnostic(message=m[3].strip(), code=m[2], source=self.type, filename=m[1])
-                case r'LINK\s?:\s?fatal\s+error\s+(\w+\d+):\s+(.+)$' as m:
-                    yield diag.Diagnostic(message=m[2].strip(), code=m[1], source=self.type)
-                case _:
-                    self._logger.debug('Unhandled line: %s', line)
+        for m in _LINK_DIAG_RE.finditer(await self._read_output(lines)):
+            if m['code'] is not None:
+                yield diag.Diagnostic(message=m['message'].strip(), code=m['code'], source=self.type, filename=m['filename'])
+            else:
+                yield diag.Diagnostic(message=m['fatal_message'].strip(), code=m['fatal_code'], source=self.type)
@@ -40,8 +40,7 @@ class _RCCObject(CXXObject, internal=True):
     async def __build__(self):
         p = self.parent
         out, err, rc = await async_run([p.rcc, self.resource_file], logger=p, log=False, cwd=self.build_path, env=self.toolchain.env)
-        async with aiofiles.open(self.source, 'w') as f:
-            await f.write(out)
+        await aiofiles.write_file(self.source, out)
 
         await super().__build__()
 
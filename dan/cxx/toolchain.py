@@ -10,6 +10,7 @@ from dan.cxx.compile_commands import CompileCommands
 
 import typing as t
 
+import re
 import tempfile
 
 CommandArgs = list[str|Path]
@@ -26,20 +27,17 @@ class CppStd:
 
 class LibraryList:
     def __init__(self, *items: t.Iterable):
-        self._lst = list()
+        # insertion-ordered dict used as an ordered set
+        self._lst: dict[t.Any, None] = dict()
         self.extend(items)
     
     def add(self, item):
-        if not item in self._lst:
-            self._lst.append(item)
+        self._lst.setdefault(item, None)
 
     def extend(self, items):
         for item in items:
-            try:
-                self._lst.remove(item)
-            except ValueError:
-                pass
-        self._lst.extend(items)
+            self._lst.pop(item, None)
+            self._lst[item] = None
 
     def __iter__(self):
         return iter(self._lst)
@@ -108,6 +106,8 @@ class Toolchain(Logging):
         self.rpath = None
         self.runtime = RuntimeType.dynamic
         self.build_type = BuildType.debug
+        self.__compile_templates: dict[tuple, list] = dict()
+        self.__up_to_date_flags_hash: int = None
 
     @property
     def arch(self):
@@ -121,10 +121,16 @@ class Toolchain(Logging):
     
     @property
     def up_to_date(self):
+        # the persisted cache stores the flags themselves (str hashes are salted per process),
+        # the full comparison is only done once per flags set in a given process
+        flags_hash = hash(tuple(self.settings.cxx_flags))
+        if flags_hash == self.__up_to_date_flags_hash:
+            return True
         if not 'arch' in self.cache or self.cache['arch'] is None:
             return False
         if not 'arch_detect_flags' in self.cache or self.cache['arch_detect_flags'] != self.settings.cxx_flags:
             return False
+        self.__up_to_date_flags_hash = flags_hash
         return True
 
     
@@ -148,6 +154,7 @@ class Toolchain(Logging):
                 is_host = True
 
         self.cache['is_host'] = is_host
+        self.__up_to_date_flags_hash = hash(tuple(self.settings.cxx_flags))
 
     async def get_default_defines(self) -> dict[str, str]:
         return self.cache['defines']
@@ -191,6 +198,19 @@ class Toolchain(Logging):
     async def _handle_link_output(self, lines) -> t.Iterable[diag.Diagnostic]:
         raise NotImplementedError()
 
+    def _diagnostics_capture(self, handler, diags: list[diag.Diagnostic]):
+        """Make an output capture feeding diags with the diagnostics produced by handler"""
+        async def capture(stream):
+            with stream as lines:
+                async for d in handler(lines):
+                    diags.append(d)
+        return capture
+
+    @staticmethod
+    async def _read_output(lines) -> str:
+        """Join the whole output stream, allowing diagnostics patterns to be matched at once"""
+        return ''.join([line async for line in lines])
+
     async def scan_dependencies(self, sourcefile: Path, output: Path, options: set[str]) -> set[FileDependency]:
         raise NotImplementedError()
 
@@ -202,6 +222,27 @@ class Toolchain(Logging):
 
     def make_compile_commands(self, sourcefile: Path, output: Path, options: set[str], build_type=None) -> CommandArgsList:
         raise NotImplementedError()
+
+    def make_compile_command_template(self, sourcefile: Path, options: set[str], build_type=None) -> list:
+        raise NotImplementedError()
+
+    def compile_command_template(self, sourcefile: Path, options: set[str], build_type=None) -> list:
+        """Compile command arguments that do not depend on the source and output files
+
+        Computed once per (source kind, options, build type), then shared by every source of a target.
+        """
+        if build_type is None:
+            # resolved here: the toolchain build type may change once templates were cached (eg.: Make.initialize)
+            build_type = self.build_type
+        key = (sourcefile.suffix, tuple(options), tuple(self.compile_options), build_type)
+        template = self.__compile_templates.get(key)
+        if template is None:
+            template = self.make_compile_command_template(sourcefile, options, build_type)
+            self.__compile_templates[key] = template
+        return template
+
+    def make_preprocess_commands(self, sourcefile: Path, options: set[str]) -> CommandArgsList:
+        raise NotImplementedError()
     
     def from_unix_flags(self, flags: list[str]) -> list[str]:
         """Convert flags from unix-style to target-compiler-style"""
@@ -211,15 +252,8 @@ class Toolchain(Logging):
         """Convert flags from target-compiler-style to unix-style"""
         return flags
 
-    async def compile(self, sourcefile: Path, output: Path, options: set[str], build_type=None, **kwds):
+    async def __compile(self, sourcefile: Path, output: Path, options: set[str], build_type, diags: list[diag.Diagnostic], **kwds):
         commands = self.make_compile_commands(sourcefile, output, options, build_type)
-        diags = []
-        if diag.enabled:
-            async def capture(stream):
-                with stream as lines:
-                    async for diag in self._handle_compile_output(lines):
-                        diags.append(diag)
-            kwds['all_capture'] = capture
         for index, command in enumerate(commands):
             try:
                 await self.run(f'compile{index}', output, command, **kwds, cwd=output.parent)
@@ -227,18 +261,22 @@ class Toolchain(Logging):
                 raise CompilationFailure(err, sourcefile, options, command, self, diags) from None
         return commands, diags
 
+    async def _compile_fast(self, sourcefile: Path, output: Path, options: set[str], build_type=None, **kwds):
+        return await self.__compile(sourcefile, output, options, build_type, [], **kwds)
+
+    async def _compile_with_capture(self, sourcefile: Path, output: Path, options: set[str], build_type=None, **kwds):
+        diags = []
+        kwds['all_capture'] = self._diagnostics_capture(self._handle_compile_output, diags)
+        return await self.__compile(sourcefile, output, options, build_type, diags, **kwds)
+
+    # selected by _select_diagnostics_variants
+    compile = _compile_fast
+
     def make_link_commands(self, objects: set[Path], output: Path, options: set[str]) -> CommandArgsList:
         raise NotImplementedError()
 
-    async def link(self, objects: set[Path], output: Path, options: set[str], **kwds):
+    async def __link(self, objects: set[Path], output: Path, options: set[str], diags: list[diag.Diagnostic], **kwds):
         commands = self.make_link_commands(objects, output, options)
-        diags = []
-        if diag.enabled:
-            async def capture(stream):
-                with stream as lines:
-                    async for diag in self._handle_link_output(lines):
-                        diags.append(diag)
-            kwds['all_capture'] = capture
         for index, command in enumerate(commands):
             try:
                 await self.run(f'link{index}', output, command, **kwds, cwd=output.parent)
@@ -246,6 +284,17 @@ class Toolchain(Logging):
                 raise LinkageFailure(err, objects, options, command, self, diags) from None
         return commands, diags
 
+    async def _link_fast(self, objects: set[Path], output: Path, options: set[str], **kwds):
+        return await self.__link(objects, output, options, [], **kwds)
+
+    async def _link_with_capture(self, objects: set[Path], output: Path, options: set[str], **kwds):
+        diags = []
+        kwds['all_capture'] = self._diagnostics_capture(self._handle_link_output, diags)
+        return await self.__link(objects, output, options, diags, **kwds)
+
+    # selected by _select_diagnostics_variants
+    link = _link_fast
+
     def make_static_lib_commands(self, objects: set[Path], output: Path, options: set[str]) -> CommandArgsList:
         raise NotImplementedError()
 
@@ -268,7 +317,7 @@ class Toolchain(Logging):
         return commands
 
     async def run(self, name: str, output: Path, args, quiet=False, **kwds) -> tuple[str, str, int]:
-        return await async_run(args, env={**(self.env or dict()), 'LC_ALL': 'C'}, logger=self if not quiet else None, **kwds)
+        return await async_run(args, env={**(self.env or dict()), 'LC_ALL': 'C'}, logger=self if not quiet else None, shell=False, **kwds)
 
     @property
     def cxxmodules_flags(self) -> list[str]:
@@ -279,7 +328,7 @@ class Toolchain(Logging):
             f.write(source)
             f.flush()
             fname = Path(f.name)
-            _, __, rc = sync_run(self.make_compile_commands(fname, fname.with_suffix('.o'), options)[0], no_raise=True)
+            _, __, rc = sync_run(self.make_compile_commands(fname, fname.with_suffix('.o'), options)[0], no_raise=True, shell=False)
             return rc == 0
 
     def has_include(self, *includes, options: set[str] = set(), extension='.cpp'):
@@ -291,6 +340,56 @@ class Toolchain(Logging):
         #error "{d} is not defined"
         #endif''' for d in definitions])
         return self.can_compile(source, options, extension)
+
+    def __probe(self, kind: str, conditions: dict[str, str], options: set[str], extension: str) -> dict[str, bool]:
+        """Evaluate several preprocessor conditions with a single compiler invocation
+
+        Each condition guards a marker token, the preprocessed output is then searched for the markers.
+        """
+        key = (kind, frozenset(options), extension, tuple(conditions.keys()))
+        probes = self.cache.setdefault('probes', dict())
+        if key in probes:
+            return probes[key]
+        source = '\n'.join([f'#if {condition}\n__dan_probe_{index}__\n#endif'
+                            for index, condition in enumerate(conditions.values())])
+        with tempfile.NamedTemporaryFile('w', suffix=extension) as f:
+            f.write(source)
+            f.flush()
+            out, _, rc = sync_run(self.make_preprocess_commands(Path(f.name), options)[0], no_raise=True, shell=False)
+        if rc != 0 or out is None:
+            out = ''
+        found = {int(index) for index in re.findall(r'__dan_probe_(\d+)__', out)}
+        result = {name: index in found for index, name in enumerate(conditions.keys())}
+        probes[key] = result
+        return result
+
+    def has_includes(self, includes: t.Iterable[str], options: set[str] = set(), extension='.cpp') -> dict[str, bool]:
+        """Check for multiple includes at once
+
+        :param includes: The includes to check (eg.: '<linux/time.h>').
+        :return: A mapping of each include to its availability.
+        """
+        return self.__probe('includes', {inc: f'__has_include({inc})' for inc in includes}, options, extension)
+
+    def has_definitions(self, definitions: t.Iterable[str], options: set[str] = set(), extension='.cpp') -> dict[str, bool]:
+        """Check for multiple definitions at once
+
+        :param definitions: The definitions to check (eg.: '__linux').
+        :return: A mapping of each definition to its availability.
+        """
+        return self.__probe('definitions', {d: f'defined({d})' for d in definitions}, options, extension)
     
     async def get_default_include_paths(self, lang = 'c++') -> list[str]:
         return []
+
+
+def _select_diagnostics_variants(enabled: bool):
+    """Swap compile/link implementations so that disabled diagnostics cost nothing per call"""
+    if enabled:
+        Toolchain.compile = Toolchain._compile_with_capture
+        Toolchain.link = Toolchain._link_with_capture
+    else:
+        Toolchain.compile = Toolchain._compile_fast
+        Toolchain.link = Toolchain._link_fast
+
+diag.on_change(_select_diagnostics_variants)
@@ -1,5 +1,5 @@
-from functools import cached_property
-from dan.core import aiofiles, diagnostics as diag
+from functools import cached_property, lru_cache
+from dan.core import diagnostics as diag
 from dan.core.pm import re_match
 from dan.core.settings import BuildType
 from dan.core.utils import unique
@@ -7,12 +7,50 @@ from dan.cxx.toolchain import CommandArgsList, Toolchain, Path, FileDependency,
 from dan.cxx import auto_fpic
 from dan.core.runners import sync_run
 
+import os
+import re
 import typing as t
 
 cxx_extensions = ['.cpp', '.cxx', '.C', '.cc']
 c_extensions = ['.c']
 
 
+# a make rule token: escaped spaces are part of the path
+_DEP_TOKEN = re.compile(rb'(?:\\ |\S)+')
+
+
+class _DiagPatterns:
+    """Precompiled compiler/linker output patterns (see _gen_gcc_compile_diags and _gen_ld_link_diags)"""
+    gcc_caret = re.compile(r'\s+?\|\s(\s+)?(\^~+)', re.ASCII)
+    gcc_included_from = re.compile(r'((?:.+)from (.+)):(\d+)[,:]', re.ASCII)
+    gcc_instantiation = re.compile(r'(.+?): In instantiation of \'(.+)\'', re.ASCII)
+    gcc_required_from = re.compile(r'(.+?):(\d+):(?:(\d+):)?\s+(required from\s.+)', re.ASCII)
+    gcc_note = re.compile(r'(.+?):(\d+):(?:(\d+):)?\s(note):\s(.+)$', re.ASCII)
+    gcc_diagnostic = re.compile(r'(.+?):(\d+):(?:(\d+):)?\s(?:fatal )?(error|warning):\s(.+)$', re.ASCII)
+    ld_in_function = re.compile(r'(.+): in function `(.+)\':$', re.ASCII)
+    ld_section = re.compile(r'(?:.+: )?(?:(.+):)?\((.+)\+(.+)\): (.+)$', re.ASCII)
+    ld_undefined_reference = re.compile(r'(?:.+?: )?(.+?):(\d+): (undefined reference to.+)$', re.ASCII)
+
+
+# the same include/library sets are transformed for every target sharing them
+
+@lru_cache(maxsize=None)
+def _include_options(include_paths: tuple) -> tuple[str, ...]:
+    return tuple(unique([f'-I{p}' for p in include_paths]))
+
+
+@lru_cache(maxsize=None)
+def _link_options(libraries: tuple) -> tuple[str, ...]:
+    opts = list()
+    for lib in libraries:
+        if isinstance(lib, Path):
+            opts.append(f'-l{lib.stem.removeprefix("lib")}')
+        else:
+            assert isinstance(lib, str)
+            opts.append(f'-l{lib}')
+    return tuple(opts)
+
+
 class UnixToolchain(Toolchain):
     def __init__(self, data, tools, *args, **kwargs):
         Toolchain.__init__(self, data, tools, *args, **kwargs)
@@ -23,6 +61,7 @@ class UnixToolchain(Toolchain):
         # self.as_ = data['as'] if 'as' in data else tools['as']
         # self.strip = data['env']['STRIP'] if 'env' in data and 'STRIP' in data['env'] else tools['strip']
         self.env = data['env'] if 'env' in data else None
+        self.__link_flags: dict[tuple, tuple[str, ...]] = dict()
         self.debug('cxx compiler is %s %s (%s)',
                    self.type, self.version, self.cc)
         self.debug('cxx compiler is %s %s (%s)',
@@ -70,11 +109,11 @@ class UnixToolchain(Toolchain):
         return unique(flags)
 
     def has_cxx_compile_options(self, *opts) -> bool:
-        _, err, _ = sync_run([self.cxx, *opts], no_raise=True)
+        _, err, _ = sync_run([self.cxx, *opts], no_raise=True, shell=False)
         return err.splitlines()[0].find('no input files') >= 0
 
     def make_include_options(self, include_paths: set[Path]) -> list[str]:
-        return unique([f'-I{p}' for p in include_paths])
+        return list(_include_options(tuple(include_paths)))
 
     def make_libpath_options(self, libraries: set[Path | str]) -> list[str]:
         opts = list()
@@ -89,14 +128,7 @@ class UnixToolchain(Toolchain):
         return opts
 
     def make_link_options(self, libraries: set[Path | str]) -> list[str]:
-        opts = list()
-        for lib in libraries:
-            if isinstance(lib, Path):
-                opts.append(f'-l{lib.stem.removeprefix("lib")}')
-            else:
-                assert isinstance(lib, str)
-                opts.append(f'-l{lib}')
-        return opts
+        return list(_link_options(tuple(libraries)))
 
     def make_compile_definitions(self, definitions: set[str]) -> list[str]:
         return unique([f'-D{d}' for d in definitions])
@@ -134,18 +166,20 @@ class UnixToolchain(Toolchain):
 
     async def scan_dependencies(self, sourcefile: Path, output: Path, options: set[str]) -> set[FileDependency]:
         deps_path = output.with_suffix(".o.d")
-        deps = list()
-        if deps_path.exists():
-            async with aiofiles.open(deps_path, 'r') as f:
-                for dep in await f.readlines():
-                    dep = dep.strip()
-                    if dep.endswith('\\'):
-                        dep = dep[:-2]
-                    deps.append(dep.strip())
-                _obj = deps.pop(0)
-                if len(deps) > 0:
-                    _src = deps.pop(0)
-        return set(deps)
+        # small and just written by the compiler: read inline rather than with three thread hops
+        try:
+            with open(deps_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return set()
+        tokens = _DEP_TOKEN.findall(data.replace(b'\\\r\n', b' ').replace(b'\\\n', b' '))
+        # skip the object target ("obj:") and the source file itself
+        for index, token in enumerate(tokens):
+            if token.endswith(b':'):
+                break
+        else:
+            return set()
+        return {os.fsdecode(token.replace(b'\\ ', b' ')) for token in tokens[index + 2:]}
 
     def compile_generated_files(self, output: Path) -> set[Path]:
         return {output.with_suffix(output.suffix + '.d')}
@@ -154,17 +188,36 @@ class UnixToolchain(Toolchain):
     def cxxmodules_flags(self) -> list[str]:
         return ['-std=c++20', '-fmodules-ts']
 
-    def make_compile_commands(self, sourcefile: Path, output: Path, options: set[str], build_type=None) -> CommandArgsList:
+    def make_compile_command_template(self, sourcefile: Path, options: set[str], build_type=None) -> list:
         args = self.get_base_compile_args(sourcefile, build_type)
-        args.extend([*self.compile_options, *options, '-MD', '-MT', str(output),
-                    '-MF', f'{output}.d', '-o', str(output), '-c', str(sourcefile)])
+        args.extend([*self.compile_options, *options])
         if auto_fpic:
             args.insert(1, '-fPIC')
+        return args
+
+    def make_compile_commands(self, sourcefile: Path, output: Path, options: set[str], build_type=None) -> CommandArgsList:
+        # only the per-TU tail is built here, the (cached) template is concatenated once
+        output = str(output)
+        return [self.compile_command_template(sourcefile, options, build_type)
+                + ['-MD', '-MT', output, '-MF', output + '.d', '-o', output, '-c', str(sourcefile)]]
+
+    def make_preprocess_commands(self, sourcefile: Path, options: set[str]) -> CommandArgsList:
+        args = self.get_base_compile_args(sourcefile, None)
+        args.extend([*self.compile_options, *options, '-E', str(sourcefile)])
         return [args]
 
+    def link_flags(self, options: list[str]) -> tuple[str, ...]:
+        """Deduplicated link flags, computed once per options set"""
+        key = (tuple(options), tuple(self.link_options))
+        flags = self.__link_flags.get(key)
+        if flags is None:
+            flags = tuple(unique(
+                self.default_ldflags, self.default_cflags, self.default_cxxflags, self.link_options, options))
+            self.__link_flags[key] = flags
+        return flags
+
     def make_link_commands(self, objects: set[Path], output: Path, options: list[str]) -> CommandArgsList:
-        args = [self.cxx, *objects, '-o', str(output), *unique(
-            self.default_ldflags, self.default_cflags, self.default_cxxflags, self.link_options, options)]
+        args = [self.cxx, *objects, '-o', str(output), *self.link_flags(options)]
         commands = [args]
         if self._build_type in [BuildType.release, BuildType.release_min_size]:
             commands.append([self.strip, output])
@@ -207,15 +260,17 @@ class UnixToolchain(Toolchain):
         prev_diag: diag.Diagnostic = None
         async for line in lines:
             match re_match(line):
-                case r'\s+?\|\s(\s+)?(\^~+)' as m:
+                case _DiagPatterns.gcc_caret as m:
                     if prev is not None:
                         if isinstance(prev, diag.Diagnostic):
-                            rng = prev.range
+                            holder = prev
                         else:
-                            rng = prev.location.range
-                        rng.start.character = len(m[1]) if m[1] else 0
-                        rng.end.character = rng.start.character + len(m[2])
-                case r'((?:.+)from (.+)):(\d+)[,:]' as m:
+                            holder = prev.location
+                        rng = holder.range
+                        start = len(m[1]) if m[1] else 0
+                        holder.range = diag.Range(start=diag.Position(rng.start.line, start),
+                                                  end=diag.Position(rng.end.line, start + len(m[2])))
+                case _DiagPatterns.gcc_included_from as m:
                     message = m[1]
                     if message.startswith('In file included'):
                         _from.clear()
@@ -226,9 +281,9 @@ class UnixToolchain(Toolchain):
                                                range=diag.Range(start=diag.Position(lineno), end=diag.Position(lineno))),
                         message=message)
                     _from.append(info)
-                case r'(.+?): In instantiation of \'(.+)\'' as m:
+                case _DiagPatterns.gcc_instantiation as m:
                     _from.clear()
-                case r'(.+?):(\d+):(?:(\d+):)?\s+(required from\s.+)' as m:
+                case _DiagPatterns.gcc_required_from as m:
                     filename = m[1]
                     lineno = int(m[2]) - 1
                     character = int(m[3]) - 1 if m[3] else 0
@@ -238,7 +293,7 @@ class UnixToolchain(Toolchain):
                                                range=diag.Range(start=diag.Position(lineno, character), end=diag.Position(lineno, character))),
                         message=message)
                     _from.append(info)
-                case r'(.+?):(\d+):(?:(\d+):)?\s(note):\s(.+)$' as m:
+                case _DiagPatterns.gcc_note as m:
                     filename = m[1]
                     character = int(m[3]) if m[3] else 0
                     lineno = int(m[2]) - 1
@@ -253,7 +308,7 @@ class UnixToolchain(Toolchain):
                             message=message)
                         prev_diag.related_information.insert(0, info)
                         prev = info
-                case r'(.+?):(\d+):(?:(\d+):)?\s(?:fatal )?(error|warning):\s(.+)$' as m:
+                case _DiagPatterns.gcc_diagnostic as m:
                     character = int(m[3]) if m[3] else 0
                     lineno = int(m[2]) - 1
                     message = m[5]
@@ -282,10 +337,10 @@ class UnixToolchain(Toolchain):
         object = None
         async for line in lines:
             match re_match(line):
-                case r'(.+): in function `(.+)\':$' as m:
+                case _DiagPatterns.ld_in_function as m:
                     object = m[1]
                     function = m[2]
-                case r'(?:.+: )?(?:(.+):)?\((.+)\+(.+)\): (.+)$' as m:
+                case _DiagPatterns.ld_section as m:
                     # link error may not be associated to a source file,
                     # in which case the associated file is the object
                     filename = m[1] or object
@@ -296,7 +351,7 @@ class UnixToolchain(Toolchain):
                         message=message,
                         source=self.type
                     )
-                case r'(?:.+?: )?(.+?):(\d+): (undefined reference to.+)$' as m:
+                case _DiagPatterns.ld_undefined_reference as m:
                     filename = m[1]
                     line = int(m[2])
                     message = m[3].strip()
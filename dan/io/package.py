@@ -56,7 +56,7 @@ class PackageBuild(Target, internal=True):
             else:
                 for version in avail_versions:
                     if self.spec.is_compatible(version):
-                        self.debug(f'using version {version} to match {self.spec}')
+                        self.debug('using version %s to match %s', version, self.spec)
                         self.version = version
                         break
 
@@ -274,8 +274,7 @@ class IoPackage(Target, internal=True):
             content.extend(await f.readlines())
         dest = self.build_path / self.cmake_path / pkg.name
         dest.parent.mkdir(parents=True, exist_ok=True)
-        async with aiofiles.open(dest, 'w') as f:
-            await f.writelines(content)
+        await aiofiles.write_file(dest, content)
 
     
     async def __build__(self):
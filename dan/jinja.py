@@ -1,4 +1,4 @@
-import aiofiles
+from dan.core import aiofiles
 from dan.core.pathlib import Path
 from dan.core.target import Target, TargetDependencyLike
 from dan.core import asyncio
@@ -35,8 +35,7 @@ class generator:
                 env = jinja2.Environment(
                     loader=jinja2.FileSystemLoader(self.source_path))
                 template = env.get_template(self.template)
-                async with aiofiles.open(self.output, 'w') as out:
-                    await out.write(template.render(data))
+                await aiofiles.write_file(self.output, template.render(data))
 
         # hack the module location (used for Makefile's Targets resolution)
         JinjaGenerator.__module__ = fn.__module__
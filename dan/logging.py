@@ -60,14 +60,18 @@ class ColoredFormatter(Formatter):
             self.COLOR_FORMAT if use_color else self.FORMAT, datefmt="%H:%M:%S"
         )
         self.use_color = use_color
+        self._colored_levels = {
+            levelname: color(levelname, attrs=["bold", *self.COLORS_ATTRS[levelname]])
+            for levelname, color in self.COLORS.items()
+        }
 
     def format(self, record):
-        levelname = record.levelname
-        if self.use_color and levelname in self.COLORS:
-            record.levelname = self.COLORS[levelname](
-                levelname, attrs=["bold", *self.COLORS_ATTRS[levelname]]
-            )
-            record.msg = self.COLORS[levelname](record.msg, attrs=[])
+        if self.use_color:
+            levelname = record.levelname
+            colored_levelname = self._colored_levels.get(levelname)
+            if colored_levelname is not None:
+                record.levelname = colored_levelname
+                record.msg = self.COLORS[levelname](record.msg, attrs=[])
         return super().format(record)
 
 
@@ -114,15 +118,17 @@ setLoggerClass(ColoredLogger)
 
 
 class Logging:
+    _logger: Logger = None
+
     def get_logger(self, name=None):
-        logger = getattr(self, "_logger", None)
+        logger = self._logger
         if logger is None:
             if name is None:
                 name = getattr(self, "fullname", self.__class__.__name__)
             if name.startswith("root."):
                 name = name.removeprefix("root.")
             logger = getLogger(name)
-            setattr(self, "_logger", logger)
+            self._logger = logger
         return logger
 
     def trace(self, msg, *args, **kwargs):
@@ -137,6 +143,9 @@ class Logging:
     def warning(self, msg, *args, **kwargs):
         self.get_logger().warning(msg, *args, **kwargs)
 
+    def warn(self, msg, *args, **kwargs):
+        self.get_logger().warning(msg, *args, **kwargs)
+
     def error(self, msg, *args, **kwargs):
         self.get_logger().error(msg, *args, **kwargs)
 
@@ -147,12 +156,12 @@ class Logging:
 def _get_makefile_logger():
     from dan.core.include import context
 
-    if not hasattr(context.current, "_logger"):
-        makefile_logger = getLogger(context.current.name)
+    current = context.current
+    makefile_logger: Logger = getattr(current, "_logger", None)
+    if makefile_logger is None:
+        makefile_logger = getLogger(current.name)
         setup_logger(makefile_logger)
-        setattr(context.current, "_logger", makefile_logger)
-    else:
-        makefile_logger: Logger = getattr(context.current, "_logger")
+        current._logger = makefile_logger
     return makefile_logger
 
 
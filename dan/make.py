@@ -1,8 +1,10 @@
 from dataclasses import dataclass, field
 import functools
+import hashlib
 import itertools
 import os
 import fnmatch
+import re
 
 from dataclasses_json import dataclass_json
 import sys
@@ -22,18 +24,64 @@ from dan.core.settings import InstallMode, InstallSettings, Settings
 from dan.core.test import Test
 from dan.core.utils import unique
 from dan.cxx import init_toolchains
-from dan.core.target import Option, Target
+from dan.core.target import Option, Target, new_build_epoch
 from dan.cxx.targets import Executable
 from dan.core.runners import max_jobs
 from dan.core.terminal import TerminalMode, TermStream, set_mode as set_terminal_mode
 
 
+_GLOB_CHARS = frozenset('*?[')
+
+
+@functools.lru_cache
+def _name_filter(pattern: str) -> t.Callable[[t.Iterable[str]], list[str]]:
+    """Make a filter selecting names matching '*pattern*'
+
+    Bare tokens are matched as substrings, globs are translated to a regex once.
+    """
+    if _GLOB_CHARS.isdisjoint(pattern):
+        return lambda names: [name for name in names if pattern in name]
+    match = re.compile(fnmatch.translate(f'*{pattern}*')).match
+    return lambda names: [name for name in names if match(name)]
+
+
+def _makefiles_digest(makefiles: t.Iterable[str], *extra: str) -> str:
+    """Digest of the makefiles contents (and extra configuration strings)"""
+    sha256 = hashlib.sha256()
+    for item in extra:
+        sha256.update(item.encode())
+    for makefile in makefiles:
+        sha256.update(makefile.encode())
+        with open(makefile, 'rb') as f:
+            sha256.update(f.read())
+    return sha256.hexdigest()
+
+
+def _makefiles_stamps(makefiles: t.Iterable[str]) -> list[tuple[int, int]]:
+    """Modification times and sizes of the makefiles, a cheap change check before digesting them"""
+    stamps = list()
+    for makefile in makefiles:
+        stat = os.stat(makefile)
+        stamps.append((stat.st_mtime_ns, stat.st_size))
+    return stamps
+
+
+def _type_names(obj) -> frozenset[str]:
+    return frozenset(f'{cls.__module__}.{cls.__qualname__}' for cls in type(obj).__mro__)
+
+
 def flatten(list_of_lists):
-    if len(list_of_lists) == 0:
-        return list_of_lists
-    if isinstance(list_of_lists[0], Iterable):
-        return flatten(list_of_lists[0]) + flatten(list_of_lists[1:])
-    return list_of_lists[:1] + flatten(list_of_lists[1:])
+    out = []
+    stack = [iter(list_of_lists)]
+    while stack:
+        for item in stack[-1]:
+            if isinstance(item, Iterable) and not isinstance(item, (str, bytes)):
+                stack.append(iter(item))
+                break
+            out.append(item)
+        else:
+            stack.pop()
+    return out
 
 
 @dataclass_json
@@ -177,36 +225,45 @@ class Make(logging.Logging):
         self.term = TermStream("make")
 
         if diags:
-            diag.enabled = True
+            diag.enable()
 
         self.for_install = for_install
 
-        self.build_path = Path(build_path)
+        # normalized once, every build path is derived from it
+        self.build_path = build_path = Path(build_path)
         self.config_path = build_path / self._config_name
         self.cache_path = build_path / self._cache_name
+        self.__source_path: tuple[str, Path] = None
 
         self.required_targets = targets
+        self._required_filters = tuple(_name_filter(required) for required in targets or ())
         sys.pycache_prefix = str(build_path / "__pycache__")
         self._config = ConfigCache.instance(self.config_path)
         self.cache = Cache.instance(self.cache_path, binary=True)
 
-        self.debug(f"jobs: {jobs}")
+        self.jobs = jobs
+        self.debug("jobs: %s", jobs)
 
         self._diagnostics = diag.DiagnosticCollection()
 
         self.context = Context()
 
-    @property
+    # the config object is never replaced once loaded: resolve it once, then hit the instance dict
+    @functools.cached_property
     def config(self) -> Config:
         return self._config.data
 
-    @property
+    @functools.cached_property
     def settings(self) -> Settings:
-        return self._config.data.settings
+        return self.config.settings
 
     @property
-    def source_path(self):
-        return Path(self.config.source_path)
+    def source_path(self) -> Path:
+        # converted once per configured value (configure() may change it)
+        source_path = self.config.source_path
+        if self.__source_path is None or self.__source_path[0] != source_path:
+            self.__source_path = (source_path, Path(source_path))
+        return self.__source_path[1]
 
     @property
     def toolchain(self):
@@ -246,14 +303,15 @@ class Make(logging.Logging):
     async def initialize(self):
         assert self.config_path.exists(), "configure first"
 
-        self.debug(f"source path: {self.source_path}")
-        self.debug(f"build path: {self.build_path}")
+        self.debug("source path: %s", self.source_path)
+        self.debug("build path: %s", self.build_path)
 
         toolchain = self.config.toolchain
         build_type = self.settings.build_type
 
         self.info(f"using '{toolchain}' toolchain in '{build_type.name}' mode")
 
+        new_build_epoch()
         with self.context:
             init_toolchains(toolchain, self.settings)
             try:
@@ -265,27 +323,91 @@ class Make(logging.Logging):
         target_toolchain = self.context.get("cxx_target_toolchain")
         target_toolchain.build_type = build_type
         if self.for_install:
-            library_dest = (
-                Path(self.settings.install.destination)
-                / self.settings.install.libraries_prefix
-            )
-            target_toolchain.rpath = str(library_dest.absolute())
+            self._configure_install_rpath()
+        self._store_graph()
+
+        self.debug("targets: %s", logging.lazy_fmt(lambda: str([t.name for t in self.targets])))
+
+    _graph_version = '3'
 
-        self.debug(f"targets: {[t.name for t in self.targets]}")
+    def __graph_config(self) -> str:
+        # toolchain and settings may select the defined targets too
+        return self.config.to_json()
 
-    def __matches(self, target: Target | Test):
-        for required in self.required_targets:
-            if fnmatch.fnmatch(target.fullname, f"*{required}*"):
-                return True
-        return False
+    def __graph_key(self, makefiles: list[str], config: str) -> str:
+        return _makefiles_digest(makefiles, self._graph_version, config)
+
+    def _store_graph(self):
+        """Store a summary of the loaded targets, re-usable until a makefile or the configuration changes (see cached_graph)"""
+        makefiles = sorted(str(path) for path in self.context.imported_makefiles)
+        config = self.__graph_config()
+        stamps = _makefiles_stamps(makefiles)
+        graph = self.cache.data.get('graph')
+        if graph is not None and graph['makefiles'] == makefiles and graph['stamps'] == stamps and graph['config'] == config:
+            # nothing changed since stored: makefiles are not digested on every build
+            return
+        self.cache.data['graph'] = {
+            'key': self.__graph_key(makefiles, config),
+            'config': config,
+            'makefiles': makefiles,
+            'stamps': stamps,
+            'targets': {target.fullname: _type_names(target) for target in self.root.all_targets},
+            'type_names': {target.fullname: type(target).__name__ for target in self.root.all_targets},
+            'default': [target.fullname for target in self.root.all_default],
+            'options': [opt.fullname for opt in itertools.chain(
+                itertools.chain.from_iterable(target.options for target in self.root.all_targets),
+                itertools.chain.from_iterable(makefile.options for makefile in self.context.all_makefiles),
+            )],
+        }
+
+    def cached_graph(self) -> dict | None:
+        """Targets summary stored by the last initialization
+
+        Allows querying target and option names without executing the makefiles.
+        Returns None when not initialized yet, or if any makefile, the configuration or an option changed since.
+        """
+        graph = self.cache.data.get('graph')
+        if graph is None:
+            return None
+        config = self.__graph_config()
+        if graph['config'] != config:
+            return None
+        try:
+            if _makefiles_stamps(graph['makefiles']) == graph['stamps']:
+                return graph
+            # touched makefiles: only a content change invalidates the graph
+            key = self.__graph_key(graph['makefiles'], config)
+        except OSError:
+            return None
+        return graph if key == graph['key'] else None
+
+    def _configure_install_rpath(self):
+        target_toolchain = self.context.get("cxx_target_toolchain")
+        library_dest = (
+            Path(self.settings.install.destination)
+            / self.settings.install.libraries_prefix
+        )
+        target_toolchain.rpath = str(library_dest.absolute())
+
+    def cached_target_names(self, graph: dict) -> list[str]:
+        """Fullnames of the selected targets (see targets), from a cached graph"""
+        if self.required_targets:
+            matched = set()
+            for name_filter in self._required_filters:
+                matched.update(name_filter(graph['targets']))
+            return [fullname for fullname in graph['targets'] if fullname in matched]
+        return list(graph['default'])
 
     @functools.cached_property
     def targets(self) -> list[Target]:
         items = list()
         if self.required_targets and len(self.required_targets) > 0:
-            for target in self.root.all_targets:
-                if self.__matches(target):
-                    items.append(target)
+            by_fullname = self.root.targets_by_fullname
+            fullnames = list(by_fullname.keys())
+            matched = set()
+            for name_filter in self._required_filters:
+                matched.update(name_filter(fullnames))
+            items = [target for fullname, target in by_fullname.items() if fullname in matched]
         else:
             items = self.root.all_default
         return items
@@ -294,6 +416,8 @@ class Make(logging.Logging):
     def tests(self) -> list[Test]:
         items = list()
         if self.required_targets and len(self.required_targets) > 0:
+            all_tests = {test.fullname: test for test in self.root.all_tests}
+            test_names = list(all_tests.keys())
             for required in self.required_targets:
                 pos = required.find(":")
                 if pos > 0:
@@ -303,37 +427,32 @@ class Make(logging.Logging):
                     test_name = required
                     test_case = None
 
-                for test in self.root.all_tests:
-                    if fnmatch.fnmatch(test.fullname, f"*{test_name}*"):
-                        if len(test) > 1 and test_case is not None:
-                            cases = list()
-                            for case in test.cases:
-                                if fnmatch.fnmatch(case.name, test_case):
-                                    cases.append(case)
-                            if len(cases) == 0:
-                                self.warning(
-                                    "couldn't find any test case in %s matching '%s'",
-                                    test.name,
-                                    test_case,
-                                )
-                            test.cases = cases
-
-                        items.append(test)
+                for fullname in _name_filter(test_name)(test_names):
+                    test = all_tests[fullname]
+                    if len(test) > 1 and test_case is not None:
+                        matched = set(fnmatch.filter([case.name for case in test.cases if case.name is not None], test_case))
+                        cases = [case for case in test.cases if case.name in matched]
+                        if len(cases) == 0:
+                            self.warning(
+                                "couldn't find any test case in %s matching '%s'",
+                                test.name,
+                                test_case,
+                            )
+                        test.cases = cases
+
+                    items.append(test)
         else:
             for test in self.root.all_tests:
                 items.append(test)
         return items
 
-    @property
+    # targets and makefiles are fixed once initialized
+    @functools.cached_property
     def all_options(self) -> list[Option]:
-        opts = []
-        for target in self.targets:
-            for o in target.options:
-                opts.append(o)
-        for makefile in self.context.all_makefiles:
-            for o in makefile.options:
-                opts.append(o)
-        return opts
+        return list(itertools.chain(
+            itertools.chain.from_iterable(target.options for target in self.targets),
+            itertools.chain.from_iterable(makefile.options for makefile in self.context.all_makefiles),
+        ))
 
     @property
     def diagnostics(self):
@@ -349,28 +468,31 @@ class Make(logging.Logging):
 
         result = {Path(source): None for source in sources}
 
-        def check(t: CXXObjectsTarget):
+        targets_by_path: dict[Path, list[CXXObjectsTarget]] = dict()
+        for target in self.root.all_targets:
+            if isinstance(target, CXXObjectsTarget):
+                targets_by_path.setdefault(target.source_path, []).append(target)
+
+        # walk each source's ancestors once instead of testing every target against every source
+        candidates: dict[CXXObjectsTarget, list[Path]] = dict()
+        for source in result.keys():
+            for parent in source.parents:
+                for target in targets_by_path.get(parent, ()):
+                    candidates.setdefault(target, []).append(source)
+
+        def check(t: CXXObjectsTarget, sources: list[Path]):
             nonlocal result
-            for source in result.keys():
-                if t.source_path not in source.parents:
-                    continue
+            for source in sources:
                 if source.suffix[1].lower() == "h":
+                    parents = set(source.parents)
                     for p in [*t.includes.private_raw, *t.includes.public_raw]:
-                        p: Path = p
-                        if p not in source.parents:
-                            continue
-                        result[source] = t
+                        if p in parents:
+                            result[source] = t
                 else:
                     t._init_sources()
-                    if source.name in [Path(s).name for s in t.sources]:
+                    if source.name in {Path(s).name for s in t.sources}:
                         result[source] = t
 
-        object_targets = [
-            target
-            for target in self.root.all_targets
-            if isinstance(target, CXXObjectsTarget)
-        ]
-
         def _on_done(task: asyncio.Task):
             nonlocal result
             if not task.cancelled():
@@ -379,8 +501,8 @@ class Make(logging.Logging):
                     g.cancel()
 
         async with asyncio.TaskGroup() as g:
-            for t in object_targets:
-                g.create_task(asyncio.async_wait(check, t)).add_done_callback(_on_done)
+            for t, t_sources in candidates.items():
+                g.create_task(asyncio.async_wait(check, t, t_sources)).add_done_callback(_on_done)
 
         return result
 
@@ -388,14 +510,16 @@ class Make(logging.Logging):
         await self.initialize()
         from dan.core.settings import _apply_inputs
 
-        all_opts = self.all_options
+        opts_by_name = {opt.fullname: opt for opt in self.all_options}
 
         def get_option(name):
-            for opt in all_opts:
-                if opt.fullname == name:
-                    return opt.cache, opt.value, opt.type
+            opt = opts_by_name.get(name)
+            if opt is not None:
+                return opt.cache, opt.value, opt.type
 
         _apply_inputs(options, get_option, logger=self, input_type_name="option")
+        # makefiles were executed with the previous values: the stored graph may not match anymore
+        self.cache.data.pop('graph', None)
 
     async def apply_settings(self, *settings):
         from dan.core.settings import apply_settings
@@ -403,6 +527,7 @@ class Make(logging.Logging):
         apply_settings(self.settings, *settings, logger=self)
 
     @staticmethod
+    @functools.cache
     def toolchains():
         from dan.cxx.detect import get_toolchains
 
@@ -431,6 +556,15 @@ class Make(logging.Logging):
                     deps.add(d)
                     await self.get_all_dependencies(d, deps)
 
+    @staticmethod
+    def dependents_of(targets: t.Iterable[Target]) -> dict[Target, list[Target]]:
+        """Reverse dependency index: target -> targets (among targets) depending on it"""
+        dependents: dict[Target, list[Target]] = dict()
+        for target in targets:
+            for dep in target.target_dependencies:
+                dependents.setdefault(dep, []).append(target)
+        return dependents
+
     async def build(self, targets: list[Target] = None):
         await self.initialize()
 
@@ -444,10 +578,15 @@ class Make(logging.Logging):
 
         all_targets.update(targets)
 
+        new_build_epoch()
         self.term.status("building...")
+        # targets with a dependent are built (awaited) by that dependent: only schedule the top ones
+        # (subprocess launches are bounded by the runners' jobs semaphore)
+        dependents = self.dependents_of(all_targets)
         async with self.term.task_group("building...") as g:
             for t in all_targets:
-                g.create_task(self._build_target(t))
+                if t not in dependents:
+                    g.create_task(self._build_target(t))
 
         self.term.status("done", icon="✔")
 
@@ -483,8 +622,9 @@ class Make(logging.Logging):
     async def install(self, mode: InstallMode = InstallMode.user):
         await self.initialize()
 
-        self.for_install = True
-        await self.initialize()
+        if not self.for_install:
+            self.for_install = True
+            self._configure_install_rpath()
         targets = []
         for t in self.targets:
             if t.installed:
@@ -506,13 +646,11 @@ class Make(logging.Logging):
         )
         manifest_path.parent.mkdir(parents=True, exist_ok=True)
 
-        async with aiofiles.open(manifest_path, "w") as f:
-            await f.writelines(
-                [
-                    os.path.relpath(p, manifest_path.parent) + "\n"
-                    for p in installed_files
-                ]
-            )
+        manifest_dir = manifest_path.parent
+        await aiofiles.write_file(
+            manifest_path,
+            "".join([f"{os.path.relpath(p, manifest_dir)}\n" for p in installed_files]),
+        )
 
     async def package(self, pkg_type: str, mode: InstallMode = InstallMode.user):
         import tempfile
@@ -568,6 +706,7 @@ class Make(logging.Logging):
             load_env_toolchain(script)
         else:
             create_toolchains()
+        Make.toolchains.cache_clear()
 
     async def run(self):
         await self.initialize()
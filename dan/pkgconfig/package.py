@@ -145,6 +145,8 @@ class Data:
 
 class PackageConfig(CXXTarget, internal=True):
     all: dict[str, 'PackageConfig'] = dict()
+    by_name: dict[str, 'PackageConfig'] = dict()
+    """Packages indexed by target name (ie.: <name>-pkgconfig)"""
 
     default = False
 
@@ -164,6 +166,7 @@ class PackageConfig(CXXTarget, internal=True):
         self.all[name] = self
 
         super().__init__(f'{name}-pkgconfig', **kwargs)
+        self.by_name[self.name] = self
 
         if dan_plugin:
             self.__dan_plugin = dan_plugin
@@ -221,10 +224,6 @@ class PackageConfig(CXXTarget, internal=True):
         self.__lib_paths = data['__lib_paths']
         self.__bin_paths = data.get('__bin_paths', None)
 
-    @property
-    def modification_time(self):
-        return 0.0
-
     @property
     def found(self):
         return True
@@ -457,6 +456,5 @@ async def create_pkg_config(lib: Library, settings: InstallSettings) -> Path:
             'requires': requires
         })
     dest.parent.mkdir(parents=True, exist_ok=True)
-    async with aiofiles.open(dest, 'w') as f:
-        await f.write(data)
+    await aiofiles.write_file(dest, data)
     return dest
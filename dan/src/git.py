@@ -1,15 +1,50 @@
+import contextlib
+import hashlib
+import os
+import re
 from typing import Iterable
 from dan.core.pathlib import Path
-from dan.core import aiofiles
+from dan.core import aiofiles, asyncio
 from dan.src.base import SourcesProvider
 from dan.core.runners import async_run
 
 
+_COMMIT_SHA = re.compile(r'[0-9a-fA-F]{7,40}')
+_mirror_locks: dict[str, asyncio.Lock] = dict()
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+@contextlib.asynccontextmanager
+async def _mirror_lock(mirror: Path):
+    """Serialize mirror updates: between tasks (asyncio lock) and between processes (flock on <mirror>.lock)"""
+    async with _mirror_locks.setdefault(str(mirror), asyncio.Lock()):
+        if fcntl is None:
+            yield
+            return
+        mirror.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(f'{mirror}.lock', os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            # blocking wait done off the event loop
+            await asyncio.to_thread(fcntl.flock, fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
 class GitSources(SourcesProvider, internal=True):
 
     url: str = None
     refspec: str = None
     patches: Iterable = list()
+    mirror: bool = True
+    """Fetch through a local mirror shared by all projects (~/.dan/git), instead of cloning from url on every build"""
 
     def __init__(self, *args, url=None, refspec=None, patches=None, subdirectory=None, **kwargs) -> None:
         super().__init__(*args, **kwargs)
@@ -26,22 +61,55 @@ class GitSources(SourcesProvider, internal=True):
 
     async def __build__(self):
         try:
-            self.output.mkdir()            
-            await async_run(f'git init -q', logger=self, cwd=self.output)
-            await async_run(f'git remote add origin {self.url}', logger=self, cwd=self.output)
-            if self.subdirectory is not None:
-                # use sparse
-                await async_run(f'git config core.sparseCheckout true', logger=self, cwd=self.output)
-                async with aiofiles.open(self.git_dir / 'info' / 'sparse-checkout', 'w') as f:
-                    await f.writelines([self.subdirectory])
-
-            await async_run(f'git fetch -q --depth 1 origin {self.refspec}', logger=self, cwd=self.output)
-            await async_run(f'git checkout -q FETCH_HEAD', logger=self, cwd=self.output)
-            
+            self.output.mkdir()
+            if self.mirror:
+                mirror = await self.__update_mirror()
+                await self.__fetch(mirror.as_uri(), f'refs/dan/{self.refspec}')
+            elif self.subdirectory is None and not _COMMIT_SHA.fullmatch(self.refspec):
+                # named ref (branch/tag): a single shallow clone
+                await async_run(['git', '-C', self.output, '-c', 'advice.detachedHead=false', 'clone', '-q', '--depth', '1', '--single-branch', '--branch', self.refspec, self.url, '.'],
+                                logger=self, shell=False)
+            else:
+                await self.__fetch(self.url, self.refspec)
+
             for patch in self.patches:
-                await async_run(f'git am {self.source_path / patch}', logger=self, cwd=self.output)
+                await async_run(['git', '-C', self.output, 'am', self.source_path / patch], logger=self, shell=False)
 
         except Exception as e:
             await aiofiles.rmtree(self.output)
             raise e
 
+    async def __update_mirror(self) -> Path:
+        """Make refspec available (as refs/dan/<refspec>) in the local mirror of url"""
+        from dan.cxx.detect import get_dan_path
+        mirror = get_dan_path() / 'git' / hashlib.sha256(self.url.encode()).hexdigest()
+        ref = f'refs/dan/{self.refspec}'
+        async with _mirror_lock(mirror):
+            if not mirror.exists():
+                mirror.mkdir(parents=True)
+                try:
+                    await async_run(['git', '-C', mirror, 'init', '-q', '--bare'], logger=self, shell=False)
+                except Exception:
+                    await aiofiles.rmtree(mirror)
+                    raise
+            elif _COMMIT_SHA.fullmatch(self.refspec):
+                # commits are immutable: no need to reach the remote once fetched
+                _, _, rc = await async_run(['git', '-C', mirror, 'rev-parse', '-q', '--verify', f'{ref}^{{commit}}'],
+                                           logger=self, log=False, no_raise=True, shell=False)
+                if rc == 0:
+                    return mirror
+            await async_run(['git', '-C', mirror, 'fetch', '-q', '--depth', '1', self.url, f'+{self.refspec}:{ref}'],
+                            logger=self, shell=False)
+        return mirror
+
+    async def __fetch(self, url: str, refspec: str):
+        await async_run(['git', '-C', self.output, 'init', '-q'], logger=self, shell=False)
+        if self.subdirectory is not None:
+            # use sparse (config and info/sparse-checkout are independent)
+            await asyncio.gather(
+                async_run(['git', '-C', self.output, 'config', 'core.sparseCheckout', 'true'], logger=self, shell=False),
+                aiofiles.write_file(self.git_dir / 'info' / 'sparse-checkout', [self.subdirectory]))
+
+        # fetched by url: no remote to register first
+        await async_run(['git', '-C', self.output, 'fetch', '-q', '--depth', '1', url, refspec], logger=self, shell=False)
+        await async_run(['git', '-C', self.output, 'checkout', '-q', 'FETCH_HEAD'], logger=self, shell=False)
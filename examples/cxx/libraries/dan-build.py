@@ -12,18 +12,20 @@ self.options.add('library_type', LibraryType.AUTO, 'The library type to build.')
 
 @generator('lib-config.hpp')
 async def config(self):
-    from dan.core import aiofiles
-    is_linux = target_toolchain.has_definition('__linux')
-    has_this_flag_does_not_exist = target_toolchain.has_cxx_compile_options(
-        '-this-flag-does-not-exist')
-    has_time_h = target_toolchain.has_include('<linux/time.h>')
-    has_kernel_timespec = target_toolchain.can_compile('''
+    from dan.core import aiofiles, asyncio
+    # each probe spawns the compiler: run them concurrently
+    is_linux, has_this_flag_does_not_exist, has_time_h, has_kernel_timespec = await asyncio.gather(
+        asyncio.async_wait(target_toolchain.has_definition, '__linux'),
+        asyncio.async_wait(target_toolchain.has_cxx_compile_options, '-this-flag-does-not-exist'),
+        asyncio.async_wait(target_toolchain.has_include, '<linux/time.h>'),
+        asyncio.async_wait(target_toolchain.can_compile, '''
         #include <linux/time.h>
         #include <linux/time_types.h>
         #include <cstdint>
         struct __kernel_timespec ts;
         static_assert(sizeof(ts) == 2 * sizeof(uint64_t));
-        ''')
+        '''),
+    )
     async with aiofiles.open(self.output, 'w') as f:
         await f.write(f'''#pragma once
 
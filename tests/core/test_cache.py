@@ -0,0 +1,29 @@
+import pickle
+import tempfile
+import unittest
+
+from dan.core.cache import Cache
+from dan.core.pathlib import Path
+
+
+class CacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'test.cache'
+
+    def tearDown(self):
+        Cache.clear_all()
+        self.tmp.cleanup()
+
+    def test_lazy_load(self):
+        cache = Cache(self.path, cache_name='lazy', binary=True)
+        with open(self.path, 'wb') as f:
+            pickle.dump({'answer': 42}, f)
+        self.assertFalse(cache.loaded)
+        self.assertFalse(cache.dirty)
+        self.assertEqual(cache.data['answer'], 42)
+        self.assertTrue(cache.loaded)
+        self.assertFalse(cache.dirty)
+        cache.data['answer'] = 0
+        self.assertTrue(cache.dirty)
@@ -0,0 +1,58 @@
+import json
+import tempfile
+import unittest
+
+from dan.core.pathlib import Path
+from dan.cxx.compile_commands import CompileCommands
+
+
+class CompileCommandsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_insert_get(self):
+        cc = CompileCommands(self.path)
+        source = self.path / 'src' / '..' / 'main.cpp'
+        cc.insert(source, self.path, ['g++', '-c', 'main.cpp'])
+        cc.insert(self.path / 'main.cpp', self.path, ['g++', '-O2', '-c', 'main.cpp'])
+        self.assertEqual(len(cc.data), 1)
+        self.assertEqual(cc.get(source)['command'], 'g++ -O2 -c main.cpp')
+
+    def test_load_deduplicates(self):
+        file = str(self.path / 'main.cpp')
+        entries = [
+            {'file': file, 'directory': self.tmp.name, 'command': 'old'},
+            {'file': file, 'directory': self.tmp.name, 'command': 'new'},
+        ]
+        (self.path / 'compile_commands.json').write_text(json.dumps(entries))
+        cc = CompileCommands(self.path)
+        self.assertEqual(len(cc.data), 1)
+        self.assertEqual(cc.get(Path(file))['command'], 'new')
+
+    def test_update_only_when_dirty(self):
+        cc = CompileCommands(self.path)
+        cc.update()
+        self.assertFalse(cc.cc_path.exists())
+        cc.insert(self.path / 'main.cpp', self.path, ['g++', '-c', 'main.cpp'])
+        cc.update()
+        mtime = cc.cc_path.stat().st_mtime_ns
+        cc.insert(self.path / 'main.cpp', self.path, ['g++', '-c', 'main.cpp'])
+        cc.update()
+        self.assertEqual(cc.cc_path.stat().st_mtime_ns, mtime)
+        self.assertEqual(CompileCommands(self.path).data, cc.data)
+
+    def test_update_leaves_no_temporary(self):
+        cc = CompileCommands(self.path)
+        cc.insert(self.path / 'main.cpp', self.path, ['g++', '-c', 'main.cpp'])
+        cc.update()
+        self.assertEqual([p.name for p in self.path.iterdir()], ['compile_commands.json'])
+        self.assertEqual(cc.cc_path.stat().st_mode & 0o777, 0o644)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import json
+import unittest
+
+from dan.core import diagnostics as diag
+
+
+class DiagnosticsTests(unittest.TestCase):
+
+    def test_to_dict(self):
+        d = diag.Diagnostic('an error',
+                            range=diag.Range(start=diag.Position(1, 2), end=diag.Position(1, 5)),
+                            filename='main.cpp',
+                            related_information=[
+                                diag.RelatedInformation(diag.Location(diag.Uri('lib.hpp'), diag.Range()), 'from here')
+                            ])
+        self.assertEqual(d.to_dict(), {
+            'message': 'an error',
+            'range': {'start': {'line': 1, 'character': 2}, 'end': {'line': 1, 'character': 5}},
+            'severity': 0,
+            'relatedInformation': [{
+                'location': {
+                    'uri': {'scheme': 'file', 'path': 'lib.hpp', 'fragment': ''},
+                    'range': {'start': {'line': 0, 'character': 0}, 'end': {'line': 0, 'character': 0}},
+                },
+                'message': 'from here',
+            }],
+        })
+
+    def test_collection(self):
+        diagnostics = diag.DiagnosticCollection()
+        diagnostics.insert([
+            diag.Diagnostic('first', code='E1', source='gcc'),
+            diag.Diagnostic('second', severity=diag.Severity.WARNING, filename='other.cpp'),
+        ], 'main.cpp')
+        data = json.loads(diagnostics.to_json())
+        self.assertEqual(set(data.keys()), {'main.cpp', 'other.cpp'})
+        self.assertEqual(data['main.cpp'][0]['code'], 'E1')
+        self.assertEqual(data['main.cpp'][0]['source'], 'gcc')
+        self.assertEqual(data['other.cpp'][0]['severity'], 1)
+        self.assertNotIn('filename', data['other.cpp'][0])
+
+    def test_default_range(self):
+        d1 = diag.Diagnostic('first')
+        d2 = diag.Diagnostic('second')
+        self.assertIs(d1.range, d2.range)
+        with self.assertRaises(AttributeError):
+            d1.range.start.line = 42
+        d1.range = diag.Range(start=diag.Position(42))
+        self.assertEqual(d2.range.start.line, 0)
+
+    def test_toolchain_variants(self):
+        from dan.cxx.toolchain import Toolchain
+        previous = diag.enabled
+        try:
+            diag.enable()
+            self.assertIs(Toolchain.compile, Toolchain._compile_with_capture)
+            self.assertIs(Toolchain.link, Toolchain._link_with_capture)
+            diag.disable()
+            self.assertIs(Toolchain.compile, Toolchain._compile_fast)
+            self.assertIs(Toolchain.link, Toolchain._link_fast)
+        finally:
+            diag.enable(previous)
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from dan.core.target import FileDependency, files_changed, new_build_epoch, _scanned_mtime
+
+
+class FileDependencyTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        new_build_epoch()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_mtime_per_epoch(self):
+        dep = FileDependency(os.path.join(self.tmp.name, 'source.cpp'))
+        self.assertFalse(dep.up_to_date)
+        dep.touch()
+        # still memoized for the current epoch
+        self.assertFalse(dep.up_to_date)
+        new_build_epoch()
+        self.assertTrue(dep.up_to_date)
+        self.assertEqual(dep.modification_time, os.stat(dep).st_mtime)
+
+    def test_files_changed_within_epoch(self):
+        a = os.path.join(self.tmp.name, 'a.h')
+        b = os.path.join(self.tmp.name, 'b.h')
+        with open(a, 'w') as f:
+            f.write('old')
+        os.utime(a, (1.0, 1.0))
+        dep = FileDependency(b)
+        self.assertEqual(_scanned_mtime(a, None), 1.0)
+        self.assertFalse(dep.up_to_date)
+        # generated by a target during the same build
+        with open(a, 'w') as f:
+            f.write('new')
+        with open(b, 'w') as f:
+            f.write('generated')
+        files_changed([a, b])
+        self.assertEqual(_scanned_mtime(a, None), os.stat(a).st_mtime)
+        self.assertEqual(_scanned_mtime(b, None), os.stat(b).st_mtime)
+        self.assertTrue(dep.up_to_date)
+
+    def test_files_changed_keeps_unrelated(self):
+        other_dir = os.path.join(self.tmp.name, 'other')
+        os.mkdir(other_dir)
+        source = FileDependency(os.path.join(other_dir, 'source.cpp'))
+        source.touch()
+        os.utime(source, (1.0, 1.0))
+        self.assertEqual(source.modification_time, 1.0)
+        os.utime(source, (2.0, 2.0))
+        files_changed([os.path.join(self.tmp.name, 'generated.h')])
+        # not written by a target: still memoized for the current epoch
+        self.assertEqual(source.modification_time, 1.0)
+
+    def test_missing_raises(self):
+        dep = FileDependency(os.path.join(self.tmp.name, 'missing.cpp'))
+        with self.assertRaises(FileNotFoundError):
+            dep.modification_time
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -38,6 +38,14 @@ class CXXSimpleLibTest(PyMakeBaseTest):
         #                     "a source modification should trigger a re-build")
         #     self.modified_at = target.output.modification_time
 
+    async def test_all_targets(self):
+        async with self.section("aggregated targets", clean=True) as make:
+            own_targets = make.root.targets
+            all_targets = make.root.all_targets
+            self.assertIs(all_targets, make.root.all_targets, "aggregated targets should be memoized")
+            self.assertEqual(own_targets, make.root.targets, "aggregating should not alter own targets")
+            self.assertIn(make.root.find('simplelib'), all_targets)
+
 
     # async def test_install(self):
     #     target_name = 'simplelib'